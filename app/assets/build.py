@@ -0,0 +1,97 @@
+"""
+Сборка статических файлов.
+
+Создает в static/dist копии JS и CSS с хэшем содержимого в имени, сжатые варианты
+(.gz и, если установлен пакет brotli, .br) и manifest.json с соответствием исходных имен
+собранным. Запуск: python -m app.assets.build
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:  # brotli не обязателен: без него собираются только .gz
+    brotli = None
+
+
+STATIC_DIR = 'static'
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+# Расширения, для которых собираются версии с хэшем
+ASSET_EXTENSIONS = ('.js', '.css')
+# Расширения, для которых создаются сжатые варианты
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.svg', '.json', '.html', '.txt')
+
+
+def compress_file(path: str):
+    """
+    Создать рядом с файлом сжатые варианты path.gz и path.br.
+
+    :param path: Путь к файлу.
+    """
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # mtime=0 делает результат воспроизводимым между сборками
+    with open(f'{path}.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+    if brotli is not None:
+        with open(f'{path}.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build_assets(static_dir: str = STATIC_DIR) -> dict:
+    """
+    Собрать статические файлы с хэшем содержимого в имени и сжатыми вариантами.
+
+    :param static_dir: Каталог статики.
+    :return: Манифест {исходный путь: путь собранного файла} относительно static_dir.
+    """
+
+    dist_root = os.path.join(static_dir, DIST_DIR)
+    shutil.rmtree(dist_root, ignore_errors=True)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        if os.path.abspath(root) == os.path.abspath(dist_root):
+            dirs[:] = []
+            continue
+        dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != os.path.abspath(dist_root)]
+
+        for name in sorted(files):
+            stem, ext = os.path.splitext(name)
+            if ext not in ASSET_EXTENSIONS:
+                continue
+
+            source = os.path.join(root, name)
+            with open(source, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:12]
+
+            relative_dir = os.path.relpath(root, static_dir)
+            target_dir = os.path.normpath(os.path.join(dist_root, relative_dir))
+            os.makedirs(target_dir, exist_ok=True)
+            target = os.path.join(target_dir, f'{stem}.{digest}{ext}')
+            shutil.copyfile(source, target)
+            if ext in COMPRESSIBLE_EXTENSIONS:
+                compress_file(target)
+
+            key = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            manifest[key] = os.path.relpath(target, static_dir).replace(os.sep, '/')
+
+    with open(os.path.join(dist_root, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+if __name__ == '__main__':
+    built = build_assets()
+    for source, target in sorted(built.items()):
+        print(f'{source} -> {target}')
+    if brotli is None:
+        print('Пакет brotli не установлен: собраны только .gz')
@@ -0,0 +1,22 @@
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware, пропускающий без сжатия запросы к указанным префиксам путей.
+
+    Нужен для вложений: они отдаются частями по Range (сжатие сломало бы Content-Range)
+    и обычно уже сжаты.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 9,
+                 exclude_paths: tuple = ()):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'http' and scope['path'].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,48 @@
+import json
+import os
+from functools import lru_cache
+
+from fastapi.templating import Jinja2Templates
+
+from app.assets.build import STATIC_DIR, DIST_DIR, MANIFEST_NAME
+
+
+STATIC_URL = '/static/'
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> dict:
+    """
+    Загрузить манифест собранных файлов.
+
+    Если сборка не выполнялась, возвращает пустой манифест, и используются исходные файлы.
+
+    :return: Манифест {исходный путь: путь собранного файла}.
+    """
+
+    try:
+        with open(os.path.join(STATIC_DIR, DIST_DIR, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(name: str) -> str:
+    """
+    Вернуть URL статического файла с учетом хэша содержимого.
+
+    :param name: Путь к файлу относительно каталога static, например 'js/chat.js'.
+    :return: URL собранного файла или исходного, если сборки нет.
+    """
+
+    return STATIC_URL + load_manifest().get(name, name)
+
+
+def register_asset_helpers(templates: Jinja2Templates):
+    """
+    Добавить в шаблоны функцию asset_url.
+
+    :param templates: Экземпляр Jinja2Templates.
+    """
+
+    templates.env.globals['asset_url'] = asset_url
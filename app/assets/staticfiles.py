@@ -0,0 +1,85 @@
+import os
+import stat
+from mimetypes import guess_type
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response, FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Scope
+
+from app.assets.build import DIST_DIR
+
+
+# Собранные файлы содержат хэш в имени и никогда не меняются
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Поддерживаемые сжатые варианты в порядке предпочтения: (кодировка, расширение)
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def accepted_encodings(scope: Scope) -> set:
+    """
+    Разобрать заголовок Accept-Encoding.
+
+    :param scope: ASGI scope запроса.
+    :return: Множество допустимых кодировок (с q=0 исключаются).
+    """
+
+    encodings = set()
+    for item in Headers(scope=scope).get('accept-encoding', '').split(','):
+        name, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if name and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(name.lower())
+    return encodings
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Раздача статики с поддержкой заранее сжатых вариантов (.br, .gz).
+
+    Если рядом с файлом лежит сжатый вариант, а клиент его принимает, отдается он с
+    заголовком Content-Encoding. Файлы из каталога сборки кэшируются как неизменяемые.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = None
+        if scope['method'] in ('GET', 'HEAD'):
+            response = await self.precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if path.replace(os.sep, '/').startswith(f'{DIST_DIR}/') and response.status_code in (200, 304):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+            response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    async def precompressed_response(self, path: str, scope: Scope) -> Response | None:
+        """
+        Вернуть ответ со сжатым вариантом файла, если он есть и принимается клиентом.
+
+        :param path: Путь к исходному файлу.
+        :param scope: ASGI scope запроса.
+        :return: Ответ или None, если подходящего варианта нет.
+        """
+
+        accepted = accepted_encodings(scope)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if not (stat_result and stat.S_ISREG(stat_result.st_mode)):
+                continue
+
+            media_type = guess_type(path)[0] or 'text/plain'
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=media_type,
+                headers={'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'},
+            )
+            if self.is_not_modified(response.headers, Headers(scope=scope)):
+                return NotModifiedResponse(response.headers)
+            return response
+        return None
@@ -0,0 +1,25 @@
+import uuid
+
+from app.attachments.models import Attachment
+from app.dao.base import BaseDAO
+from exceptions import AttachmentNotFoundException
+
+
+class AttachmentDAO(BaseDAO):
+    """
+    Класс для запросов к бд вложений.
+    """
+
+    model = Attachment
+
+    @classmethod
+    async def ensure_exists(cls, attachment_id: uuid.UUID | None):
+        """
+        Проверить, что вложение существует (None допускается — сообщение без вложения).
+
+        :param attachment_id: ID вложения.
+        :raises AttachmentNotFoundException: Если вложения нет.
+        """
+
+        if attachment_id is not None and await cls.find_one_or_none_by_id(attachment_id) is None:
+            raise AttachmentNotFoundException
@@ -0,0 +1,18 @@
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+
+class Attachment(Base):
+    """
+    Класс модели вложения.
+
+    Запись создается на каждую загрузку со своими именем файла и MIME-типом. Содержимое хранится
+    в файловом хранилище по SHA-256, одинаковые файлы хранятся один раз и общие для всех записей.
+    """
+
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_type: Mapped[str] = mapped_column(String, nullable=False)
+    filename: Mapped[str] = mapped_column(String, nullable=False)
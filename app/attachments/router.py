@@ -0,0 +1,196 @@
+import os
+import uuid
+from typing import Tuple
+
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.attachments import storage
+from app.attachments.dao import AttachmentDAO
+from app.attachments.schemas import UploadCreateS, UploadStatusS, AttachmentReadS
+from app.chat.dao import MessageDAO
+from app.users.dependencies import get_current_user
+from app.users.models import User
+from exceptions import (AttachmentNotFoundException, UploadNotFoundException, UploadOffsetMismatchException,
+                        UploadIncompleteException, UploadTooLargeException)
+
+
+router = APIRouter(prefix='/attachments', tags=['Attachments'])
+
+# Содержимое адресуется хэшем и не меняется, поэтому кэшируется браузером без перепроверки
+ATTACHMENT_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+
+async def get_upload(upload_id: uuid.UUID, current_user: User = Depends(get_current_user)) -> dict:
+    """
+    Возвращает описание загрузки текущего пользователя.
+
+    :raises UploadNotFoundException: Если загрузки нет или она начата другим пользователем.
+    """
+
+    meta = await storage.load_upload(str(upload_id))
+    if meta is None or meta['owner_id'] != str(current_user.id):
+        raise UploadNotFoundException
+    return meta
+
+
+@router.post('/uploads', response_model=UploadStatusS)
+async def create_upload(upload: UploadCreateS, current_user: User = Depends(get_current_user)):
+    """
+    Начать загрузку вложения.
+
+    Данные передаются одним или несколькими запросами PUT /attachments/uploads/{upload_id}?offset=N,
+    после чего загрузка завершается запросом POST /attachments/uploads/{upload_id}/complete.
+    """
+
+    meta = await storage.create_upload(
+        filename=upload.filename, content_type=upload.content_type, size=upload.size, owner_id=current_user.id
+    )
+    return {'upload_id': meta['upload_id'], 'offset': 0, 'size': meta['size']}
+
+
+@router.get('/uploads/{upload_id}', response_model=UploadStatusS)
+async def get_upload_status(meta: dict = Depends(get_upload)):
+    """
+    Узнать, сколько байт уже принято, чтобы продолжить прерванную загрузку.
+    """
+
+    try:
+        offset = await storage.upload_offset(meta['upload_id'])
+    except FileNotFoundError:
+        raise UploadNotFoundException
+    return {'upload_id': meta['upload_id'], 'offset': offset, 'size': meta['size']}
+
+
+@router.put('/uploads/{upload_id}', response_model=UploadStatusS)
+async def upload_chunk(request: Request, offset: int, meta: dict = Depends(get_upload)):
+    """
+    Дописать очередную часть файла.
+
+    Тело запроса читается потоком и сразу пишется на диск.
+
+    :param request: Запрос с данными в теле.
+    :param offset: Смещение, с которого передаются данные; должно совпадать с принятым объемом.
+    :raises UploadOffsetMismatchException: Если смещение не совпадает.
+    :raises UploadTooLargeException: Если данных больше заявленного размера.
+    :raises UploadNotFoundException: Если загрузку уже завершили.
+    """
+
+    upload_id = meta['upload_id']
+    try:
+        async with storage.upload_lock(upload_id):
+            current = await storage.upload_offset(upload_id)
+            if offset != current:
+                raise UploadOffsetMismatchException
+            try:
+                current = await storage.append_chunks(upload_id, offset, meta['size'], request.stream())
+            except OverflowError:
+                raise UploadTooLargeException
+    except FileNotFoundError:
+        raise UploadNotFoundException
+
+    return {'upload_id': upload_id, 'offset': current, 'size': meta['size']}
+
+
+@router.post('/uploads/{upload_id}/complete', response_model=AttachmentReadS)
+async def complete_upload(meta: dict = Depends(get_upload)):
+    """
+    Завершить загрузку: поместить файл в хранилище и создать вложение.
+
+    Вложение создается на каждую загрузку со своими именем файла и MIME-типом. Если такое
+    содержимое уже загружалось, в хранилище остается одна копия файла.
+
+    :raises UploadIncompleteException: Если принято меньше заявленного размера.
+    :raises UploadNotFoundException: Если загрузку уже завершил другой запрос.
+    """
+
+    upload_id = meta['upload_id']
+    try:
+        async with storage.upload_lock(upload_id):
+            if await storage.upload_offset(upload_id) != meta['size']:
+                raise UploadIncompleteException
+            sha256 = await storage.finalize_upload(upload_id, meta['size'])
+    except FileNotFoundError:
+        raise UploadNotFoundException
+
+    return await AttachmentDAO.add(
+        sha256=sha256, size=meta['size'], content_type=meta['content_type'], filename=meta['filename']
+    )
+
+
+def parse_range(header: str, size: int) -> Tuple[int, int] | None:
+    """
+    Разобрать заголовок Range с одним диапазоном байт.
+
+    :param header: Значение заголовка, например 'bytes=0-1023', 'bytes=1024-' или 'bytes=-500'.
+    :param size: Размер файла.
+    :return: Пара (первый байт, последний байт) или None, если заголовок не поддерживается
+             (тогда отдается файл целиком).
+    :raises ValueError: Если диапазон невыполним.
+    """
+
+    unit, _, ranges = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+
+    start, _, end = ranges.strip().partition('-')
+    try:
+        if not start:
+            length = int(end)
+        else:
+            first = int(start)
+            last = int(end) if end else size - 1
+    except ValueError:
+        return None
+
+    if not start:
+        # Суффикс нулевой длины ('bytes=-0') невыполним
+        if length <= 0 or size == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    if first >= size or last < first:
+        raise ValueError
+    return first, min(last, size - 1)
+
+
+@router.get('/{attachment_id}')
+async def download_attachment(attachment_id: uuid.UUID, request: Request,
+                              current_user: User = Depends(get_current_user)):
+    """
+    Скачать вложение.
+
+    Поддерживаются условные запросы (If-None-Match) и частичная загрузка (Range, If-Range).
+    """
+
+    attachment = await AttachmentDAO.find_one_or_none_by_id(attachment_id)
+    if attachment is None or not await MessageDAO.attachment_visible_to(attachment_id, current_user.id):
+        raise AttachmentNotFoundException
+
+    path = storage.object_path(attachment.sha256)
+    if not os.path.exists(path):
+        raise AttachmentNotFoundException
+
+    etag = f'"{attachment.sha256}"'
+    headers = {'ETag': etag, 'Cache-Control': ATTACHMENT_CACHE_CONTROL, 'Accept-Ranges': 'bytes'}
+
+    if etag in request.headers.get('if-none-match', ''):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    if range_header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, attachment.size)
+        except ValueError:
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                            headers={'Content-Range': f'bytes */{attachment.size}'})
+        if byte_range is not None:
+            start, end = byte_range
+            headers['Content-Range'] = f'bytes {start}-{end}/{attachment.size}'
+            headers['Content-Length'] = str(end - start + 1)
+            return StreamingResponse(storage.iter_file_range(path, start, end),
+                                     status_code=status.HTTP_206_PARTIAL_CONTENT,
+                                     media_type=attachment.content_type, headers=headers)
+
+    return FileResponse(path, media_type=attachment.content_type, filename=attachment.filename,
+                        headers=headers, content_disposition_type='attachment')
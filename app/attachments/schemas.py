@@ -0,0 +1,37 @@
+import uuid
+
+from pydantic import BaseModel, Field
+
+from config import settings
+
+
+class UploadCreateS(BaseModel):
+    """
+    Схема для начала загрузки вложения.
+    """
+
+    filename: str = Field(..., min_length=1, max_length=255, description='Имя файла')
+    content_type: str = Field('application/octet-stream', max_length=255, description='MIME-тип файла')
+    size: int = Field(..., ge=1, le=settings.ATTACHMENTS_MAX_SIZE, description='Размер файла в байтах')
+
+
+class UploadStatusS(BaseModel):
+    """
+    Схема состояния загрузки: с какого смещения продолжать передачу.
+    """
+
+    upload_id: uuid.UUID = Field(..., description='Идентификатор загрузки')
+    offset: int = Field(..., description='Количество уже принятых байт')
+    size: int = Field(..., description='Ожидаемый размер файла')
+
+
+class AttachmentReadS(BaseModel):
+    """
+    Схема для чтения вложения.
+    """
+
+    id: uuid.UUID = Field(..., description='Идентификатор вложения')
+    sha256: str = Field(..., description='SHA-256 содержимого')
+    size: int = Field(..., description='Размер в байтах')
+    content_type: str = Field(..., description='MIME-тип')
+    filename: str = Field(..., description='Имя файла')
@@ -0,0 +1,315 @@
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+import anyio
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Потоковые хэши незавершенных загрузок: {upload_id: (хэш, количество учтенных байт, время обновления)}.
+# После перезапуска процесса (или если часть данных принял другой воркер) хэш пересчитывается
+# по файлу при завершении загрузки.
+_hashers: Dict[str, Tuple["hashlib._Hash", int, float]] = {}
+# Пауза между попытками взять занятую блокировку загрузки (секунды)
+LOCK_POLL_INTERVAL = 0.05
+
+
+def uploads_dir() -> str:
+    return os.path.join(settings.ATTACHMENTS_DIR, 'uploads')
+
+
+def object_path(sha256: str) -> str:
+    """
+    Путь к содержимому в хранилище: objects/ab/cd/abcd...
+
+    :param sha256: SHA-256 содержимого.
+    :return: Путь к файлу.
+    """
+
+    return os.path.join(settings.ATTACHMENTS_DIR, 'objects', sha256[:2], sha256[2:4], sha256)
+
+
+def _part_path(upload_id: str) -> str:
+    return os.path.join(uploads_dir(), f'{upload_id}.part')
+
+
+def _meta_path(upload_id: str) -> str:
+    return os.path.join(uploads_dir(), f'{upload_id}.json')
+
+
+def _try_lock(path: str) -> int | None:
+    """
+    Попробовать взять flock на файле загрузки, не дожидаясь его освобождения.
+
+    :return: Дескриптор файла (блокировка снимается при его закрытии) или None, если файл занят.
+    :raises FileNotFoundError: Если загрузки уже нет.
+    """
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+
+    try:
+        # Пока блокировку держал другой запрос, загрузку могли завершить и перенести файл
+        locked, current = os.fstat(fd), os.stat(path)
+        if (locked.st_dev, locked.st_ino) != (current.st_dev, current.st_ino):
+            raise FileNotFoundError(path)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+@asynccontextmanager
+async def upload_lock(upload_id: str):
+    """
+    Блокировка загрузки, общая для всех воркеров (flock на файле загрузки).
+
+    :raises FileNotFoundError: Если загрузки нет (например, ее уже завершил другой запрос).
+    """
+
+    path = _part_path(upload_id)
+    while (fd := _try_lock(path)) is None:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        os.close(fd)
+
+
+async def create_upload(filename: str, content_type: str, size: int, owner_id: uuid.UUID) -> dict:
+    """
+    Начать загрузку: создать пустой файл и сохранить описание загрузки рядом с ним.
+
+    :return: Описание загрузки.
+    """
+
+    upload_id = str(uuid.uuid4())
+    meta = {
+        'upload_id': upload_id,
+        'filename': filename,
+        'content_type': content_type,
+        'size': size,
+        'owner_id': str(owner_id),
+    }
+
+    def write():
+        os.makedirs(uploads_dir(), exist_ok=True)
+        open(_part_path(upload_id), 'wb').close()
+        with open(_meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    await anyio.to_thread.run_sync(write)
+    _hashers[upload_id] = (hashlib.sha256(), 0, time.monotonic())
+    return meta
+
+
+async def load_upload(upload_id: str) -> dict | None:
+    """
+    Прочитать описание загрузки.
+
+    :return: Описание загрузки или None, если ее нет.
+    """
+
+    def read():
+        try:
+            with open(_meta_path(upload_id), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    return await anyio.to_thread.run_sync(read)
+
+
+async def upload_offset(upload_id: str) -> int:
+    """
+    Количество уже принятых байт загрузки.
+
+    :raises FileNotFoundError: Если загрузки нет.
+    """
+
+    stat_result = await anyio.to_thread.run_sync(os.stat, _part_path(upload_id))
+    return stat_result.st_size
+
+
+async def append_chunks(upload_id: str, offset: int, limit: int, chunks: AsyncIterator[bytes]) -> int:
+    """
+    Дописать поток данных в файл загрузки, не держа его целиком в памяти.
+
+    Вызывать под upload_lock(upload_id) после проверки, что offset равен принятому объему.
+
+    :param upload_id: Идентификатор загрузки.
+    :param offset: Текущий размер файла загрузки.
+    :param limit: Максимальный допустимый размер файла.
+    :param chunks: Асинхронный поток блоков данных.
+    :return: Новый размер файла загрузки.
+    :raises OverflowError: Если данных больше, чем limit (принятые блоки остаются в файле).
+    """
+
+    hasher, hashed, _ = _hashers.get(upload_id, (None, -1, 0))
+    if hashed != offset:
+        # Хэш потерян (перезапуск) или разошелся с файлом: пересчитаем при завершении
+        hasher = None
+        _hashers.pop(upload_id, None)
+
+    async with await anyio.open_file(_part_path(upload_id), 'ab') as f:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if offset + len(chunk) > limit:
+                raise OverflowError
+            await f.write(chunk)
+            offset += len(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+                _hashers[upload_id] = (hasher, offset, time.monotonic())
+
+    return offset
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(settings.ATTACHMENTS_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def finalize_upload(upload_id: str, size: int) -> str:
+    """
+    Перенести загруженный файл в хранилище по его SHA-256.
+
+    Если такое содержимое уже есть, загруженная копия удаляется.
+    Вызывать под upload_lock(upload_id).
+
+    :param upload_id: Идентификатор загрузки.
+    :param size: Размер файла.
+    :return: SHA-256 содержимого.
+    """
+
+    part_path = _part_path(upload_id)
+    hasher, hashed, _ = _hashers.pop(upload_id, (None, -1, 0))
+    if hasher is not None and hashed == size:
+        sha256 = hasher.hexdigest()
+    else:
+        sha256 = await anyio.to_thread.run_sync(_hash_file, part_path)
+
+    def move():
+        target = object_path(sha256)
+        if os.path.exists(target):
+            os.remove(part_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(part_path, target)
+        os.remove(_meta_path(upload_id))
+
+    await anyio.to_thread.run_sync(move)
+    return sha256
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_stale_uploads(ttl: float) -> List[str]:
+    now = time.time()
+    removed = []
+    try:
+        names = os.listdir(uploads_dir())
+    except FileNotFoundError:
+        return removed
+
+    for upload_id in {os.path.splitext(name)[0] for name in names if name.endswith(('.part', '.json'))}:
+        part_path, meta_path = _part_path(upload_id), _meta_path(upload_id)
+        try:
+            fd = _try_lock(part_path)
+        except FileNotFoundError:
+            # Описание без файла данных (например, остаток прерванного завершения)
+            try:
+                if now - os.stat(meta_path).st_mtime > ttl:
+                    _remove_quietly(meta_path)
+                    removed.append(upload_id)
+            except FileNotFoundError:
+                pass
+            continue
+        if fd is None:
+            # Загрузка сейчас дописывается или завершается
+            continue
+
+        try:
+            if now - os.fstat(fd).st_mtime > ttl:
+                _remove_quietly(part_path)
+                _remove_quietly(meta_path)
+                removed.append(upload_id)
+        finally:
+            os.close(fd)
+    return removed
+
+
+async def cleanup_stale_uploads(ttl: float = settings.ATTACHMENTS_UPLOAD_TTL) -> int:
+    """
+    Удалить заброшенные загрузки и потоковые хэши, которые давно не обновлялись.
+
+    Загрузка считается заброшенной, если в ее файл не писали дольше ttl секунд.
+    Загрузки, которые сейчас держит другой запрос (в любом воркере), не трогаются.
+
+    :param ttl: Срок бездействия в секундах.
+    :return: Количество удаленных загрузок.
+    """
+
+    removed = await anyio.to_thread.run_sync(_remove_stale_uploads, ttl)
+    deadline = time.monotonic() - ttl
+    stale = [key for key, (_, _, updated) in _hashers.items() if updated < deadline]
+    for upload_id in (*removed, *stale):
+        _hashers.pop(upload_id, None)
+    return len(removed)
+
+
+async def upload_cleanup_loop():
+    """Периодически удалять заброшенные загрузки."""
+
+    while True:
+        await asyncio.sleep(settings.ATTACHMENTS_CLEANUP_INTERVAL)
+        try:
+            removed = await cleanup_stale_uploads()
+        except Exception:
+            logger.exception('Ошибка удаления заброшенных загрузок')
+        else:
+            if removed:
+                logger.info('Удалено заброшенных загрузок: %d', removed)
+
+
+async def iter_file_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """
+    Читать файл блоками в диапазоне [start, end].
+
+    :param path: Путь к файлу.
+    :param start: Первый байт.
+    :param end: Последний байт (включительно).
+    """
+
+    remaining = end - start + 1
+    async with await anyio.open_file(path, 'rb') as f:
+        await f.seek(start)
+        while remaining > 0:
+            chunk = await f.read(min(settings.ATTACHMENTS_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,105 @@
+"""
+Рассылка сообщений подключенным пользователям.
+
+Сообщение сериализуется один раз для каждого формата кадров (JSON, MessagePack), и все
+получатели с этим форматом получают один и тот же кадр. Отправка выполняется одновременно,
+но не больше BROADCAST_CONCURRENCY соединений сразу. Каждая отправка ограничена
+BROADCAST_SEND_TIMEOUT. Соединение, на котором отправка не удалась или зависла, закрывается
+кодом 1013 (клиент переподключится), остальные получатели этого не замечают.
+
+Рассылка доходит только до соединений текущего воркера.
+"""
+import asyncio
+import logging
+import uuid
+from typing import Dict, Iterable
+
+from starlette.websockets import WebSocket
+
+from app.chat.codec import encode_payload, send_frame
+from app.chat.connections import active_connections, close_quietly
+from app.rooms.membership import get_room_members
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _send_shared_frame(websocket: WebSocket, frames: Dict[str | None, str | bytes], payload: dict) -> bool:
+    subprotocol = getattr(websocket.state, 'subprotocol', None)
+    if subprotocol not in frames:
+        frames[subprotocol] = encode_payload(payload, subprotocol)
+
+    try:
+        await asyncio.wait_for(send_frame(websocket, frames[subprotocol]), settings.BROADCAST_SEND_TIMEOUT)
+        return True
+    except Exception:
+        try:
+            await asyncio.wait_for(close_quietly(websocket, code=1013), settings.BROADCAST_SEND_TIMEOUT)
+        except Exception:
+            pass
+        return False
+
+
+async def broadcast(payload: dict, user_ids: Iterable[uuid.UUID] | None = None,
+                    concurrency: int = settings.BROADCAST_CONCURRENCY) -> dict:
+    """
+    Разослать сообщение подключенным пользователям.
+
+    :param payload: Данные сообщения; UUID допускаются как значения.
+    :param user_ids: ID получателей (неподключенные пропускаются) или None — все подключенные.
+    :param concurrency: Максимальное число одновременных отправок.
+    :return: Статистика: recipients (подключенных получателей), sent, failed.
+    """
+
+    if user_ids is None:
+        sockets = list(active_connections.values())
+    else:
+        sockets = [active_connections[user_id] for user_id in set(user_ids) if user_id in active_connections]
+
+    stats = {'recipients': len(sockets), 'sent': 0, 'failed': 0}
+    if not sockets:
+        return stats
+
+    frames: Dict[str | None, str | bytes] = {}
+    pending = iter(sockets)
+
+    async def sender():
+        # Отправители берут соединения из общего итератора, пока они не закончатся
+        for websocket in pending:
+            if await _send_shared_frame(websocket, frames, payload):
+                stats['sent'] += 1
+            else:
+                stats['failed'] += 1
+
+    await asyncio.gather(*(sender() for _ in range(min(max(concurrency, 1), len(sockets)))))
+    if stats['failed']:
+        logger.info('Рассылка: не доставлено %d из %d', stats['failed'], stats['recipients'])
+    return stats
+
+
+async def broadcast_to_room(room_id: uuid.UUID, payload: dict, exclude: Iterable[uuid.UUID] = ()) -> dict:
+    """
+    Разослать сообщение подключенным участникам комнаты.
+
+    :param room_id: ID комнаты.
+    :param payload: Данные сообщения.
+    :param exclude: ID участников, которым отправлять не нужно.
+    :return: Статистика рассылки (см. broadcast).
+    """
+
+    members = await get_room_members(room_id)
+    return await broadcast(payload, members - set(exclude))
+
+
+async def send_to_users(user_ids: Iterable[uuid.UUID], payload: dict) -> int:
+    """
+    Разослать сообщение указанным пользователям.
+
+    :param user_ids: ID получателей (неподключенные пропускаются).
+    :param payload: Данные сообщения.
+    :return: Количество успешных отправок.
+    """
+
+    stats = await broadcast(payload, user_ids)
+    return stats['sent']
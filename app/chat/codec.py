@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import Any
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+try:
+    import msgpack
+except ImportError:  # без msgpack доступен только JSON
+    msgpack = None
+
+
+# Подпротоколы WebSocket: бинарный MessagePack (UUID передаются расширением UUID_EXT_TYPE
+# с 16 байтами) и текстовый JSON
+MSGPACK_SUBPROTOCOL = 'chat.msgpack.v1'
+JSON_SUBPROTOCOL = 'chat.json.v1'
+# Код типа расширения MessagePack для UUID: обычные bin-значения клиент оставляет байтами
+UUID_EXT_TYPE = 1
+
+# Количество отправок, которые выполняются прямо сейчас (нужно для плавной остановки)
+pending_sends = 0
+
+
+def negotiate_subprotocol(websocket: WebSocket) -> str | None:
+    """
+    Выбрать подпротокол из предложенных клиентом.
+
+    :param websocket: Входящее соединение.
+    :return: Название подпротокола или None, если клиент ничего не предлагал.
+    """
+
+    offered = websocket.scope.get('subprotocols') or []
+    if MSGPACK_SUBPROTOCOL in offered and msgpack is not None:
+        return MSGPACK_SUBPROTOCOL
+    if JSON_SUBPROTOCOL in offered:
+        return JSON_SUBPROTOCOL
+    return None
+
+
+def _json_default(value: Any):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _msgpack_default(value: Any):
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, value.bytes)
+    raise TypeError(f'Object of type {type(value).__name__} is not MessagePack serializable')
+
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == UUID_EXT_TYPE and len(data) == 16:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def encode_payload(payload: dict, subprotocol: str | None) -> str | bytes:
+    """
+    Сериализовать сообщение для отправки по WebSocket.
+
+    :param payload: Данные сообщения; UUID допускаются как значения.
+    :param subprotocol: Подпротокол соединения.
+    :return: Строка для текстового кадра или байты для бинарного.
+    """
+
+    if subprotocol == MSGPACK_SUBPROTOCOL:
+        return msgpack.packb(payload, default=_msgpack_default)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+def decode_payload(message: dict) -> dict | None:
+    """
+    Разобрать входящий кадр WebSocket.
+
+    :param message: ASGI-сообщение websocket.receive.
+    :return: Данные сообщения или None, если кадр не удалось разобрать.
+    """
+
+    try:
+        if message.get('bytes') is not None:
+            if msgpack is None:
+                return None
+            data = msgpack.unpackb(message['bytes'], ext_hook=_msgpack_ext_hook)
+        elif message.get('text') is not None:
+            data = json.loads(message['text'])
+        else:
+            return None
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def receive_payload(websocket: WebSocket) -> dict | None:
+    """
+    Дождаться следующего кадра (текстового или бинарного) и разобрать его.
+
+    :param websocket: Соединение.
+    :return: Данные сообщения или None, если кадр не удалось разобрать.
+    :raises WebSocketDisconnect: Если клиент закрыл соединение.
+    """
+
+    message = await websocket.receive()
+    if message['type'] == 'websocket.disconnect':
+        raise WebSocketDisconnect(message.get('code', 1000), message.get('reason'))
+    return decode_payload(message)
+
+
+async def send_frame(websocket: WebSocket, frame: str | bytes):
+    """
+    Отправить уже сериализованный кадр.
+
+    :param websocket: Соединение.
+    :param frame: Строка (текстовый кадр) или байты (бинарный кадр).
+    """
+
+    global pending_sends
+    pending_sends += 1
+    try:
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+    finally:
+        pending_sends -= 1
+
+
+async def wait_for_pending_sends(timeout: float) -> bool:
+    """
+    Дождаться завершения текущих отправок.
+
+    :param timeout: Максимальное время ожидания в секундах.
+    :return: True, если все отправки завершились, иначе False.
+    """
+
+    deadline = time.monotonic() + timeout
+    while pending_sends and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return not pending_sends
+
+
+async def send_payload(websocket: WebSocket, payload: dict):
+    """
+    Сериализовать сообщение в формате соединения и отправить его.
+
+    :param websocket: Соединение.
+    :param payload: Данные сообщения.
+    """
+
+    await send_frame(websocket, encode_payload(payload, getattr(websocket.state, 'subprotocol', None)))
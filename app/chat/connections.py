@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Dict, List
+
+from starlette.websockets import WebSocket, WebSocketState
+
+from app.chat.codec import send_payload
+from app.users.dao import UserDAO
+from app.users.status_cache import invalidate_users_status
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Идентификатор текущего воркера: им помечаются пользователи, подключенные к этому процессу
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+# Активные WebSocket-подключения: {user_id: websocket}
+active_connections: Dict[uuid.UUID, WebSocket] = {}
+# Время последней активности подключения по time.monotonic(): {user_id: timestamp}
+last_activity: Dict[uuid.UUID, float] = {}
+
+
+async def close_quietly(websocket: WebSocket, code: int = 1000):
+    """
+    Закрыть WebSocket, игнорируя ошибки уже разорванного соединения.
+
+    :param websocket: Соединение.
+    :param code: Код закрытия.
+    """
+
+    if websocket.application_state != WebSocketState.CONNECTED:
+        return
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass
+
+
+async def register(user_id: uuid.UUID, websocket: WebSocket):
+    """
+    Зарегистрировать подключение пользователя и отметить его онлайн.
+
+    Предыдущее подключение того же пользователя закрывается.
+
+    :param user_id: ID пользователя.
+    :param websocket: Принятое соединение.
+    """
+
+    previous = active_connections.get(user_id)
+    active_connections[user_id] = websocket
+    last_activity[user_id] = time.monotonic()
+
+    if previous is not None and previous is not websocket:
+        await close_quietly(previous)
+
+    await UserDAO.set_online(user_id=user_id, worker_id=WORKER_ID)
+    invalidate_users_status()
+
+
+async def unregister(user_id: uuid.UUID, websocket: WebSocket):
+    """
+    Удалить подключение пользователя и отметить его оффлайн.
+
+    Если соединение уже заменено новым или снято сборщиком, ничего не делает.
+
+    :param user_id: ID пользователя.
+    :param websocket: Закрывающееся соединение.
+    """
+
+    if active_connections.get(user_id) is not websocket:
+        return
+
+    active_connections.pop(user_id, None)
+    last_activity.pop(user_id, None)
+    await UserDAO.set_offline([user_id], worker_id=WORKER_ID)
+    invalidate_users_status()
+
+
+def touch(user_id: uuid.UUID):
+    """Отметить активность подключения пользователя."""
+
+    if user_id in last_activity:
+        last_activity[user_id] = time.monotonic()
+
+
+async def reap_idle_connections() -> List[uuid.UUID]:
+    """
+    Закрыть соединения, не подававшие признаков жизни дольше WS_IDLE_TIMEOUT.
+
+    :return: Список ID пользователей, чьи соединения были закрыты.
+    """
+
+    deadline = time.monotonic() - settings.WS_IDLE_TIMEOUT
+    idle = [user_id for user_id, seen in last_activity.items() if seen < deadline]
+    if not idle:
+        return idle
+
+    sockets = []
+    for user_id in idle:
+        last_activity.pop(user_id, None)
+        websocket = active_connections.pop(user_id, None)
+        if websocket is not None:
+            sockets.append(websocket)
+
+    await asyncio.gather(*(close_quietly(websocket, code=1001) for websocket in sockets))
+    await UserDAO.set_offline(idle, worker_id=WORKER_ID)
+    invalidate_users_status()
+    logger.info('Закрыто неактивных WebSocket-соединений: %d', len(idle))
+    return idle
+
+
+async def ping_connections():
+    """Отправить ping всем подключенным клиентам; клиент отвечает сообщением pong."""
+
+    async def ping(websocket: WebSocket):
+        try:
+            await send_payload(websocket, {'type': 'ping'})
+        except Exception:
+            # Разорванное соединение снимет сборщик по таймауту
+            pass
+
+    await asyncio.gather(*(ping(websocket) for websocket in list(active_connections.values())))
+
+
+async def heartbeat_loop():
+    """Периодически снимать неактивные соединения и пинговать остальные."""
+
+    while True:
+        await asyncio.sleep(settings.WS_PING_INTERVAL)
+        try:
+            await reap_idle_connections()
+            await ping_connections()
+        except Exception:
+            logger.exception('Ошибка в цикле heartbeat')
+
+
+async def reconcile_presence_loop():
+    """
+    Сверять статусы присутствия с базой данных.
+
+    Воркер продлевает присутствие своих пользователей, а затем одним запросом сбрасывает
+    статусы, которые никто не подтверждал дольше PRESENCE_STALE_AFTER (например, после
+    падения воркера). Первая сверка выполняется сразу при старте.
+    """
+
+    while True:
+        try:
+            await UserDAO.touch_online(list(active_connections), worker_id=WORKER_ID)
+            reset = await UserDAO.reset_stale_online(stale_after=settings.PRESENCE_STALE_AFTER)
+            if reset:
+                invalidate_users_status()
+                logger.info('Сброшено устаревших статусов онлайн: %d', reset)
+        except Exception:
+            logger.exception('Ошибка сверки статусов присутствия')
+        await asyncio.sleep(settings.PRESENCE_RECONCILE_INTERVAL)
+
+
+def start_presence_tasks() -> List[asyncio.Task]:
+    """
+    Запустить фоновые задачи heartbeat и сверки присутствия.
+
+    :return: Список запущенных задач.
+    """
+
+    return [
+        asyncio.create_task(heartbeat_loop(), name='ws-heartbeat'),
+        asyncio.create_task(reconcile_presence_loop(), name='presence-reconcile'),
+    ]
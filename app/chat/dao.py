@@ -1,10 +1,14 @@
 import uuid
 
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, exists, func
+from sqlalchemy.dialects.postgresql import insert
 
-from database import async_session_maker
+from database import async_session_maker, uuid7
 from  app.dao.base import BaseDAO
-from app.chat.models import Message
+from app.chat.models import Message, ReadMark
+from app.enrichment.pipeline import submit_message
+from app.rooms.models import RoomMember
+from config import settings
 
 
 class MessageDAO(BaseDAO):
@@ -14,6 +18,20 @@ class MessageDAO(BaseDAO):
 
     model = Message
 
+    @classmethod
+    async def add(cls, **values):
+        """
+        Сохранить сообщение и поставить его в очередь фоновой обработки
+        (превью ссылок, упоминания, фильтр слов). Обработка не задерживает отправку.
+
+        :param values: Данные сообщения.
+        :return: Сохраненное сообщение.
+        """
+
+        message = await super().add(**values)
+        submit_message(message)
+        return message
+
     @classmethod
     async def get_messages_between_users(cls, user_id_first: uuid, user_id_second: uuid):
         """
@@ -33,3 +51,113 @@ class MessageDAO(BaseDAO):
             ).order_by(cls.model.id)
             result = await session.execute(query)
             return result.scalars().all()
+
+    @classmethod
+    async def in_conversation(cls, message_id: uuid.UUID, user_id: uuid.UUID,
+                              peer_id: uuid.UUID | None = None, room_id: uuid.UUID | None = None) -> bool:
+        """
+        Проверить, что сообщение относится к переписке пользователя.
+
+        @:param message_id: ID сообщения.
+        @:param user_id: ID пользователя.
+        @:param peer_id: ID собеседника (для личной переписки).
+        @:param room_id: ID комнаты (для группового чата; членство в комнате проверяется отдельно).
+        @:return: True, если сообщение из этой переписки.
+        """
+
+        if room_id is not None:
+            condition = cls.model.room_id == room_id
+        else:
+            condition = or_(
+                and_(cls.model.sender_id == user_id, cls.model.recipient_id == peer_id),
+                and_(cls.model.sender_id == peer_id, cls.model.recipient_id == user_id)
+            )
+        async with async_session_maker() as session:
+            return await session.scalar(select(exists().where(cls.model.id == message_id, condition)))
+
+    @classmethod
+    async def get_room_messages(cls, room_id: uuid.UUID):
+        """
+        Асинхронно находит и возвращает все сообщения комнаты.
+
+        @:param room_id: ID комнаты.
+        @:return: Список сообщений комнаты.
+        """
+
+        async with async_session_maker() as session:
+            query = select(cls.model).filter(cls.model.room_id == room_id).order_by(cls.model.id)
+            result = await session.execute(query)
+            return result.scalars().all()
+
+    @classmethod
+    async def attachment_visible_to(cls, attachment_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        """
+        Проверяет, есть ли у пользователя доступ к вложению.
+
+        Доступ есть, если вложение прикреплено к сообщению, которое пользователь отправил,
+        получил или видит как участник комнаты.
+
+        @:param attachment_id: ID вложения.
+        @:param user_id: ID пользователя.
+        @:return: True, если доступ есть.
+        """
+
+        async with async_session_maker() as session:
+            room_ids = select(RoomMember.room_id).where(RoomMember.user_id == user_id)
+            query = select(
+                exists().where(
+                    cls.model.attachment_id == attachment_id,
+                    or_(
+                        cls.model.sender_id == user_id,
+                        cls.model.recipient_id == user_id,
+                        cls.model.room_id.in_(room_ids)
+                    )
+                )
+            )
+            result = await session.execute(query)
+            return result.scalar()
+
+
+class ReadMarkDAO(BaseDAO):
+    """
+    Класс для запросов к бд отметок о прочтении.
+    """
+
+    model = ReadMark
+
+    @classmethod
+    async def upsert_many(cls, marks: list[dict]) -> None:
+        """
+        Сохранить отметки о прочтении пачками по READ_MARKS_UPSERT_BATCH (по запросу на пачку).
+
+        Размер пачки ограничен: у PostgreSQL не больше 32767 параметров на запрос,
+        а на каждую отметку их уходит четыре.
+
+        @:param marks: Список словарей user_id, conversation_id, last_read_message_id.
+        """
+
+        async with async_session_maker() as session:
+            for start in range(0, len(marks), settings.READ_MARKS_UPSERT_BATCH):
+                batch = marks[start:start + settings.READ_MARKS_UPSERT_BATCH]
+                async with session.begin():
+                    query = insert(cls.model).values([{'id': uuid7(), **mark} for mark in batch])
+                    query = query.on_conflict_do_update(
+                        index_elements=['user_id', 'conversation_id'],
+                        set_={'last_read_message_id': query.excluded.last_read_message_id, 'updated_at': func.now()},
+                        # id сообщений возрастают со временем: отметка не откатывается на более старое сообщение
+                        where=cls.model.last_read_message_id < query.excluded.last_read_message_id,
+                    )
+                    await session.execute(query)
+
+    @classmethod
+    async def get_user_marks(cls, user_id: uuid.UUID):
+        """
+        Получить отметки о прочтении пользователя.
+
+        @:param user_id: ID пользователя.
+        @:return: Список отметок.
+        """
+
+        async with async_session_maker() as session:
+            result = await session.execute(select(cls.model).filter_by(user_id=user_id))
+            return result.scalars().all()
@@ -0,0 +1,179 @@
+"""
+Эфемерные события чата, которые клиент присылает по WebSocket.
+
+- {'type': 'typing', 'to': <user_id>} или {'type': 'typing', 'room_id': <room_id>} — пользователь
+  набирает сообщение. Пересылается собеседнику (участникам комнаты) не чаще одного раза за
+  TYPING_THROTTLE_INTERVAL на переписку, остальные события поглощаются. В бд не пишется.
+- {'type': 'read', 'peer_id' | 'room_id': <id>, 'message_id': <message_id>} — пользователь прочитал
+  переписку до сообщения message_id. Принимается, только если пользователь состоит в комнате,
+  а сообщение относится к этой переписке. В памяти хранится одна (самая поздняя) отметка на переписку,
+  накопленные отметки записываются в бд пачкой раз в READ_MARKS_FLUSH_INTERVAL. Собеседнику
+  в личной переписке отметка пересылается сразу.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, Tuple
+
+from app.chat.broadcast import send_to_users
+from app.chat.dao import MessageDAO, ReadMarkDAO
+from app.rooms.membership import get_room_members
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Время последнего пересланного события набора: {(user_id, conversation_id): time.monotonic()}
+_typing_sent: Dict[Tuple[uuid.UUID, uuid.UUID], float] = {}
+# Отметки о прочтении, еще не записанные в бд: {(user_id, conversation_id): message_id}
+_pending_read_marks: Dict[Tuple[uuid.UUID, uuid.UUID], uuid.UUID] = {}
+
+
+def _as_uuid(value) -> uuid.UUID | None:
+    """Преобразовать идентификатор из кадра (строка или 16 байт) в UUID."""
+
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        if isinstance(value, (bytes, bytearray)):
+            return uuid.UUID(bytes=bytes(value))
+        if isinstance(value, str):
+            return uuid.UUID(value)
+    except ValueError:
+        pass
+    return None
+
+
+async def handle_typing(user_id: uuid.UUID, payload: dict):
+    """
+    Переслать событие набора с ограничением частоты.
+
+    :param user_id: ID пользователя, который набирает сообщение.
+    :param payload: Данные события.
+    """
+
+    peer_id = _as_uuid(payload.get('to'))
+    room_id = _as_uuid(payload.get('room_id'))
+    conversation_id = room_id or peer_id
+    if conversation_id is None:
+        return
+
+    now = time.monotonic()
+    key = (user_id, conversation_id)
+    if now - _typing_sent.get(key, 0) < settings.TYPING_THROTTLE_INTERVAL:
+        return
+    _typing_sent[key] = now
+
+    if room_id is not None:
+        members = await get_room_members(room_id)
+        if user_id not in members:
+            return
+        await send_to_users(members - {user_id}, {'type': 'typing', 'room_id': room_id, 'user_id': user_id})
+    else:
+        await send_to_users([peer_id], {'type': 'typing', 'user_id': user_id})
+
+
+async def handle_read(user_id: uuid.UUID, payload: dict):
+    """
+    Запомнить отметку о прочтении и переслать ее собеседнику.
+
+    Отметки о комнатах, в которых пользователь не состоит, и о сообщениях из чужих переписок
+    отбрасываются.
+
+    :param user_id: ID прочитавшего пользователя.
+    :param payload: Данные события.
+    """
+
+    message_id = _as_uuid(payload.get('message_id'))
+    peer_id = _as_uuid(payload.get('peer_id'))
+    room_id = _as_uuid(payload.get('room_id'))
+    conversation_id = room_id or peer_id
+    if message_id is None or conversation_id is None:
+        return
+
+    key = (user_id, conversation_id)
+    # id сообщений возрастают со временем: отметка не новее уже запомненной ничего не меняет
+    if key in _pending_read_marks and _pending_read_marks[key] >= message_id:
+        return
+    if room_id is not None and user_id not in await get_room_members(room_id):
+        return
+    if not await MessageDAO.in_conversation(message_id, user_id, peer_id=peer_id, room_id=room_id):
+        return
+    # Пока шла проверка, могла прийти более поздняя отметка
+    if key not in _pending_read_marks or _pending_read_marks[key] < message_id:
+        _pending_read_marks[key] = message_id
+
+    if room_id is None:
+        await send_to_users([peer_id], {'type': 'read', 'user_id': user_id, 'message_id': message_id})
+
+
+EVENT_HANDLERS = {
+    'typing': handle_typing,
+    'read': handle_read,
+}
+
+
+async def handle_client_event(user_id: uuid.UUID, payload: dict | None):
+    """
+    Обработать входящее событие клиента. Неизвестные события (в том числе pong) игнорируются.
+
+    :param user_id: ID пользователя соединения.
+    :param payload: Разобранный кадр.
+    """
+
+    if not isinstance(payload, dict) or not isinstance(payload.get('type'), str):
+        return
+    handler = EVENT_HANDLERS.get(payload['type'])
+    if handler is None:
+        return
+    try:
+        await handler(user_id, payload)
+    except Exception:
+        # Некорректное событие не должно обрывать соединение
+        logger.exception('Ошибка обработки события %r от %s', payload['type'], user_id)
+
+
+async def flush_read_marks():
+    """
+    Записать накопленные отметки о прочтении в бд одним запросом.
+
+    При ошибке отметки возвращаются в очередь (если за это время не пришли более новые).
+    """
+
+    global _pending_read_marks
+    if not _pending_read_marks:
+        return
+
+    pending, _pending_read_marks = _pending_read_marks, {}
+    marks = [
+        {'user_id': user_id, 'conversation_id': conversation_id, 'last_read_message_id': message_id}
+        for (user_id, conversation_id), message_id in pending.items()
+    ]
+    try:
+        await ReadMarkDAO.upsert_many(marks)
+    except Exception:
+        for key, message_id in pending.items():
+            if key not in _pending_read_marks or _pending_read_marks[key] < message_id:
+                _pending_read_marks[key] = message_id
+        raise
+
+
+def _evict_typing_state():
+    """Удалить записи ограничителя набора, окно которых уже истекло."""
+
+    deadline = time.monotonic() - settings.TYPING_THROTTLE_INTERVAL
+    for key in [key for key, sent in _typing_sent.items() if sent < deadline]:
+        del _typing_sent[key]
+
+
+async def read_marks_flush_loop():
+    """Периодически записывать отметки о прочтении и очищать состояние индикатора набора."""
+
+    while True:
+        await asyncio.sleep(settings.READ_MARKS_FLUSH_INTERVAL)
+        _evict_typing_state()
+        try:
+            await flush_read_marks()
+        except Exception:
+            logger.exception('Не удалось записать отметки о прочтении')
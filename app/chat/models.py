@@ -1,17 +1,50 @@
 import uuid
 
-from sqlalchemy import Text, ForeignKey
+from sqlalchemy import Text, ForeignKey, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID
 
+from app.attachments.models import Attachment  # noqa: F401 (таблица нужна для внешнего ключа attachment_id)
+from app.rooms.models import Room  # noqa: F401 (таблица rooms нужна для внешнего ключа room_id)
 from database import Base
 
 
 class Message(Base):
     """
     Класс модели сообщения.
+
+    Сообщение адресовано либо пользователю (recipient_id), либо комнате (room_id).
     """
 
+    __table_args__ = (
+        CheckConstraint('(recipient_id IS NULL) <> (room_id IS NULL)', name='ck_messages_single_target'),
+        # Ключ для пакетного удаления старых сообщений по возрасту
+        Index('ix_messages_created_at_id', 'created_at', 'id'),
+    )
+
     sender_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
-    recipient_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+    recipient_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    room_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('rooms.id', ondelete='CASCADE'), nullable=True, index=True
+    )
     content: Mapped[str] = mapped_column(Text)
+    attachment_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('attachments.id'), nullable=True, index=True
+    )
+
+
+class ReadMark(Base):
+    """
+    Класс модели отметки о прочтении: последнее прочитанное сообщение в переписке.
+
+    conversation_id — ID собеседника для личной переписки или ID комнаты для группового чата.
+    """
+
+    __tablename__ = 'read_marks'
+    __table_args__ = (UniqueConstraint('user_id', 'conversation_id'),)
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False
+    )
+    conversation_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    last_read_message_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
@@ -0,0 +1,173 @@
+"""
+Очистка сообщений старше срока хранения.
+
+Сообщения удаляются небольшими пачками в порядке (created_at, id), каждая пачка — отдельная
+короткая транзакция, между пачками делается пауза. Так удаление не держит блокировки
+и не создает всплеск WAL. Следующая пачка ищется после ключа последней удаленной строки,
+чтобы не просматривать заново мертвые записи индекса от предыдущих пачек.
+
+Запуск вручную: python -m app.chat.retention [--days N] [--batch-size N] [--pause S] [--dry-run]
+Внутри приложения очистка запускается раз в PURGE_INTERVAL, если MESSAGE_RETENTION_DAYS > 0.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, func, cast, tuple_, DateTime
+
+from app.chat.models import Message
+from config import settings
+from database import async_session_maker, engine
+
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки: очистку выполняет только один воркер одновременно
+PURGE_LOCK_KEY = 0x6D736770  # 'msgp'
+
+
+async def retention_cutoff(retention_days: int) -> datetime:
+    """
+    Граница хранения по часам бд: сообщения, созданные раньше, подлежат удалению.
+
+    :param retention_days: Срок хранения в днях.
+    :return: Граница в том же представлении, что и messages.created_at.
+    """
+
+    async with async_session_maker() as session:
+        return await session.scalar(select(cast(func.now() - timedelta(days=retention_days), DateTime)))
+
+
+async def count_expired_messages(cutoff: datetime) -> int:
+    """Количество сообщений старше границы хранения."""
+
+    async with async_session_maker() as session:
+        return await session.scalar(select(func.count()).select_from(Message).where(Message.created_at < cutoff))
+
+
+async def delete_expired_batch(cutoff: datetime, after: tuple | None, batch_size: int) -> list:
+    """
+    Удалить одну пачку сообщений старше границы.
+
+    :param cutoff: Граница хранения.
+    :param after: Ключ (created_at, id) последней удаленной строки или None.
+    :param batch_size: Размер пачки.
+    :return: Ключи удаленных строк.
+    """
+
+    batch = select(Message.id).where(Message.created_at < cutoff)
+    if after is not None:
+        batch = batch.where(tuple_(Message.created_at, Message.id) > after)
+    batch = batch.order_by(Message.created_at, Message.id).limit(batch_size)
+
+    async with async_session_maker() as session:
+        async with session.begin():
+            result = await session.execute(
+                delete(Message)
+                .where(Message.id.in_(batch.scalar_subquery()))
+                .returning(Message.created_at, Message.id)
+            )
+            return result.all()
+
+
+async def purge_expired_messages(retention_days: int = settings.MESSAGE_RETENTION_DAYS,
+                                 batch_size: int = settings.PURGE_BATCH_SIZE,
+                                 pause: float = settings.PURGE_BATCH_PAUSE,
+                                 dry_run: bool = False) -> dict:
+    """
+    Удалить сообщения старше срока хранения пачками.
+
+    :param retention_days: Срок хранения в днях.
+    :param batch_size: Размер пачки.
+    :param pause: Пауза между пачками в секундах.
+    :param dry_run: Только посчитать, сколько сообщений будет удалено.
+    :return: Статистика: deleted, batches, elapsed (секунды), rate (строк в секунду).
+    """
+
+    cutoff = await retention_cutoff(retention_days)
+    if dry_run:
+        expired = await count_expired_messages(cutoff)
+        logger.info('Сообщений старше %s: %d (пробный запуск, ничего не удалено)', cutoff, expired)
+        return {'deleted': 0, 'expired': expired, 'batches': 0, 'elapsed': 0.0, 'rate': 0.0}
+
+    started = time.monotonic()
+    deleted = batches = 0
+    after = None
+
+    while True:
+        rows = await delete_expired_batch(cutoff, after, batch_size)
+        if not rows:
+            break
+
+        after = tuple(max(rows))
+        deleted += len(rows)
+        batches += 1
+        elapsed = time.monotonic() - started
+        logger.info('Очистка: пачка %d, удалено %d (всего %d, %.0f строк/с)',
+                    batches, len(rows), deleted, deleted / elapsed if elapsed else 0)
+
+        if len(rows) < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    elapsed = time.monotonic() - started
+    stats = {'deleted': deleted, 'batches': batches, 'elapsed': elapsed, 'rate': deleted / elapsed if elapsed else 0.0}
+    logger.info('Очистка завершена: удалено %d сообщений старше %s за %.1f с', deleted, cutoff, elapsed)
+    return stats
+
+
+async def purge_with_lock(**kwargs) -> dict | None:
+    """
+    Выполнить очистку, если ее не выполняет другой воркер.
+
+    :return: Статистика очистки или None, если очистка уже идет в другом процессе.
+    """
+
+    async with engine.connect() as connection:
+        # Блокировка уровня сессии держится на этом соединении всю очистку. В режиме AUTOCOMMIT
+        # соединение не открывает транзакцию и не висит "idle in transaction" до конца очистки
+        connection = await connection.execution_options(isolation_level='AUTOCOMMIT')
+        locked = await connection.scalar(select(func.pg_try_advisory_lock(PURGE_LOCK_KEY)))
+        if not locked:
+            logger.info('Очистка уже выполняется другим процессом, пропуск')
+            return None
+        try:
+            return await purge_expired_messages(**kwargs)
+        finally:
+            await connection.scalar(select(func.pg_advisory_unlock(PURGE_LOCK_KEY)))
+
+
+async def retention_loop():
+    """Периодически удалять сообщения старше MESSAGE_RETENTION_DAYS."""
+
+    while True:
+        await asyncio.sleep(settings.PURGE_INTERVAL)
+        try:
+            await purge_with_lock()
+        except Exception:
+            logger.exception('Ошибка очистки старых сообщений')
+
+
+async def main(args: argparse.Namespace):
+    try:
+        await purge_with_lock(retention_days=args.days, batch_size=args.batch_size,
+                              pause=args.pause, dry_run=args.dry_run)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Удаление сообщений старше срока хранения')
+    parser.add_argument('--days', type=int, default=settings.MESSAGE_RETENTION_DAYS, help='Срок хранения в днях')
+    parser.add_argument('--batch-size', type=int, default=settings.PURGE_BATCH_SIZE, help='Размер пачки')
+    parser.add_argument('--pause', type=float, default=settings.PURGE_BATCH_PAUSE, help='Пауза между пачками (с)')
+    parser.add_argument('--dry-run', action='store_true', help='Только посчитать подлежащие удалению сообщения')
+    arguments = parser.parse_args()
+
+    if arguments.days <= 0:
+        parser.error('Укажите срок хранения: --days или MESSAGE_RETENTION_DAYS')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    asyncio.run(main(arguments))
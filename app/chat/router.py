@@ -1,14 +1,23 @@
 import uuid
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request, Depends
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request, Depends, status
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from typing import List, Dict
-from app.chat.dao import MessageDAO
-from app.chat.schemas import MessageReadS, MessageCreateS
+from app.assets.manifest import register_asset_helpers
+from app.attachments.dao import AttachmentDAO
+from app.chat.broadcast import broadcast, broadcast_to_room, send_to_users
+from app.chat.codec import negotiate_subprotocol, receive_payload
+from app.chat.connections import active_connections, register, unregister, touch
+from app.chat.dao import MessageDAO, ReadMarkDAO
+from app.chat.events import handle_client_event
+from app.health.lifecycle import state as lifecycle_state
+from app.chat.schemas import MessageReadS, MessageCreateS, ReadMarkReadS, BroadcastCreateS, BroadcastResultS
+from app.ratelimit.dependencies import rate_limit_by_user
 from app.users.dao import UserDAO
-from app.users.dependencies import get_current_user
+from app.users.dependencies import get_current_user, get_current_admin, get_websocket_user
 from app.users.models import User
+from config import settings
 import asyncio
 
 
@@ -16,6 +25,7 @@ import asyncio
 router = APIRouter(prefix='/chat', tags=['Chat'])
 # Настройка шаблонов Jinja2
 templates = Jinja2Templates(directory='templates')
+register_asset_helpers(templates)
 
 
 # Страница чата
@@ -28,36 +38,55 @@ async def get_chat_page(request: Request, user_data: User = Depends(get_current_
                                       {"request": request, "user": user_data, 'users_all': users_all})
 
 
-# Активные WebSocket-подключения: {user_id: websocket}
-active_connections: Dict[uuid.UUID, WebSocket] = {}
+async def reject_draining(websocket: WebSocket):
+    """
+    Отклонить подключение во время остановки воркера.
 
+    Закрытие до accept() сервер превращает в ответ 403, и клиент видит только 1006. Поэтому
+    рукопожатие отклоняется ответом 503 с Retry-After, а если сервер так не умеет, соединение
+    принимается и сразу закрывается кодом 1013 (try again later): клиент переподключится.
+    """
 
-# Функция для отправки сообщения пользователю, если он подключен
-async def notify_user(user_id: uuid.UUID, message: dict):
-    """Отправить сообщение пользователю, если он подключен."""
-    if user_id in active_connections:
-        websocket = active_connections[user_id]
-        # Отправляем сообщение в формате JSON
-        await websocket.send_json(message)
+    if 'websocket.http.response' in websocket.scope.get('extensions', {}):
+        await websocket.send_denial_response(Response(status_code=503, headers={'Retry-After': '1'}))
+    else:
+        await websocket.accept()
+        await websocket.close(code=1013)
 
 
 @router.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: uuid.UUID):
-    # Принимаем соединение
-    await websocket.accept()
+    # Во время остановки новые подключения не принимаются
+    if not lifecycle_state.accepting:
+        await reject_draining(websocket)
+        return
+
+    # Подключиться можно только от своего имени: закрытие до accept() отклоняет рукопожатие (403)
+    user = await get_websocket_user(websocket)
+    if user is None or user.id != user_id:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
 
-    # Устанавливаем статус "онлайн"
-    await UserDAO.update_user_status(user_id=user_id, status=True)
-    active_connections[user_id] = websocket
+    # Принимаем соединение, согласовав формат кадров
+    subprotocol = negotiate_subprotocol(websocket)
+    websocket.state.subprotocol = subprotocol
+    await websocket.accept(subprotocol=subprotocol)
+
+    # Регистрируем соединение и устанавливаем статус "онлайн"
+    await register(user_id, websocket)
 
     try:
         while True:
-            # Поддерживаем соединение
-            await websocket.receive_text()
+            # Любое входящее сообщение (в том числе pong) продлевает жизнь соединения
+            payload = await receive_payload(websocket)
+            touch(user_id)
+            # События набора и прочтения обрабатываются в памяти, без запроса к бд на каждое
+            await handle_client_event(user_id, payload)
     except WebSocketDisconnect:
+        pass
+    finally:
         # Устанавливаем статус "оффлайн" при разрыве соединения
-        await UserDAO.update_user_status(user_id=user_id, status=False)
-        active_connections.pop(user_id, None)
+        await unregister(user_id, websocket)
 
 
 # # WebSocket эндпоинт для соединений
@@ -82,12 +111,23 @@ async def websocket_endpoint(websocket: WebSocket, user_id: uuid.UUID):
 @router.get("/messages/{user_id}", response_model=List[MessageReadS])
 async def get_messages(user_id: uuid.UUID, current_user: User = Depends(get_current_user)):
     # Возвращаем список сообщений между текущим пользователем и другим пользователем
-    messages = await MessageDAO.get_messages_between_users(user_id_first=user_id, user_id_second=current_user.id) or []
-    messages_sorted = sorted(messages, key=lambda msg: msg.created_at)
-    return messages_sorted
+    # id сообщений упорядочены по времени (UUIDv7), бд уже возвращает их хронологически
+    return await MessageDAO.get_messages_between_users(user_id_first=user_id, user_id_second=current_user.id) or []
+
 
+# Отметки о прочтении текущего пользователя
+@router.get('/read-marks', response_model=List[ReadMarkReadS])
+async def get_read_marks(current_user: User = Depends(get_current_user)):
+    return await ReadMarkDAO.get_user_marks(user_id=current_user.id)
 
-@router.post('/messages', response_model=MessageCreateS)
+
+# Ограничение частоты отправки сообщений одним пользователем
+message_rate_limit = rate_limit_by_user(
+    'messages', rate=settings.RATE_LIMIT_MESSAGES_RATE, burst=settings.RATE_LIMIT_MESSAGES_BURST
+)
+
+
+@router.post('/messages', response_model=MessageCreateS, dependencies=[Depends(message_rate_limit)])
 async def send_message(message: MessageCreateS, current_user: User = Depends(get_current_user)):
     """
     Отправить сообщение пользователю.
@@ -97,24 +137,49 @@ async def send_message(message: MessageCreateS, current_user: User = Depends(get
     :return: Результат отправки сообщения.
     """
 
-    await MessageDAO.add(
+    await AttachmentDAO.ensure_exists(message.attachment_id)
+    new_message = await MessageDAO.add(
         sender_id=current_user.id,
         content=message.content,
-        recipient_id=message.recipient_id
+        recipient_id=message.recipient_id,
+        attachment_id=message.attachment_id
     )
 
     message_data = {
-        'sender_id': str(current_user.id),
-        'recipient_id': str(message.recipient_id),
-        'content': message.content
+        'id': new_message.id,
+        'sender_id': current_user.id,
+        'recipient_id': message.recipient_id,
+        'content': message.content,
+        'attachment_id': message.attachment_id
     }
 
-    await notify_user(message.recipient_id, message_data)
-    await notify_user(current_user.id, message_data)
+    # Получателю и отправителю уходит один и тот же сериализованный кадр
+    await send_to_users({message.recipient_id, current_user.id}, message_data)
 
     return {
         'recipient_id': message.recipient_id,
         'content': message.content,
+        'attachment_id': message.attachment_id,
         'status': 'ok',
         'message': 'Сообщение сохранено'
     }
+
+
+@router.post('/broadcast', response_model=BroadcastResultS, summary='Рассылка объявления')
+async def broadcast_announcement(announcement: BroadcastCreateS, admin: User = Depends(get_current_admin)):
+    """
+    Разослать объявление подключенным пользователям: всем, указанным или участникам комнаты.
+
+    Объявление не сохраняется и доходит только до соединений воркера, обработавшего запрос.
+
+    :param announcement: Текст и получатели объявления.
+    :param admin: Текущий пользователь-администратор.
+    :return: Статистика рассылки.
+    """
+
+    payload = {'type': 'announcement', 'sender_id': admin.id, 'content': announcement.content}
+    if announcement.target == 'room':
+        return await broadcast_to_room(announcement.room_id, payload)
+    if announcement.target == 'users':
+        return await broadcast(payload, announcement.user_ids)
+    return await broadcast(payload)
@@ -1,6 +1,7 @@
 import uuid
+from typing import List, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 
@@ -11,8 +12,10 @@ class MessageReadS(BaseModel):
 
     id: uuid.UUID = Field(..., description='Уникальный идентификатор  сообщения')
     sender_id: uuid.UUID = Field(..., description='ID отправителя сообщения')
-    recipient_id: uuid.UUID = Field(..., description='ID получателя сообщения')
+    recipient_id: uuid.UUID | None = Field(None, description='ID получателя сообщения')
+    room_id: uuid.UUID | None = Field(None, description='ID комнаты, если сообщение групповое')
     content: str = Field(..., description='Содержимое сообщения')
+    attachment_id: uuid.UUID | None = Field(None, description='ID вложения')
 
 
 class MessageCreateS(BaseModel):
@@ -21,4 +24,43 @@ class MessageCreateS(BaseModel):
     """
 
     recipient_id: uuid.UUID = Field(..., description="ID получателя сообщения")
-    content: str = Field(..., description="Содержимое сообщения")
\ No newline at end of file
+    content: str = Field(..., description="Содержимое сообщения")
+    attachment_id: uuid.UUID | None = Field(None, description="ID вложения")
+
+
+class ReadMarkReadS(BaseModel):
+    """
+    Схема для чтения отметки о прочтении.
+    """
+
+    conversation_id: uuid.UUID = Field(..., description='ID собеседника или комнаты')
+    last_read_message_id: uuid.UUID = Field(..., description='ID последнего прочитанного сообщения')
+
+
+class BroadcastCreateS(BaseModel):
+    """
+    Схема для рассылки объявления.
+    """
+
+    content: str = Field(..., min_length=1, max_length=2000, description='Текст объявления')
+    target: Literal['all', 'users', 'room'] = Field('all', description='Кому: всем подключенным, пользователям или комнате')
+    user_ids: List[uuid.UUID] | None = Field(None, description='ID пользователей (для target=users)')
+    room_id: uuid.UUID | None = Field(None, description='ID комнаты (для target=room)')
+
+    @model_validator(mode='after')
+    def check_target(self):
+        if self.target == 'users' and not self.user_ids:
+            raise ValueError('Для target=users нужно указать user_ids')
+        if self.target == 'room' and self.room_id is None:
+            raise ValueError('Для target=room нужно указать room_id')
+        return self
+
+
+class BroadcastResultS(BaseModel):
+    """
+    Схема для результата рассылки.
+    """
+
+    recipients: int = Field(..., description='Подключенных получателей')
+    sent: int = Field(..., description='Доставлено')
+    failed: int = Field(..., description='Не доставлено')
@@ -1,5 +1,4 @@
 import logging
-import uuid
 from shutil import which
 
 from sqlalchemy.exc import SQLAlchemyError
@@ -59,8 +58,6 @@ class BaseDAO:
         :param values: Данные для создания.
         :return: Созданный экземпляр модели.
         """
-
-        values['id'] = values.get('id', uuid.uuid4())
         async with async_session_maker() as session:
             async with session.begin():
                 new_instance = cls.model(**values)
@@ -0,0 +1,208 @@
+"""
+Фоновая обработка новых сообщений.
+
+MessageDAO.add ставит сохраненное сообщение в ограниченную очередь (ENRICH_QUEUE_SIZE) и сразу
+возвращает управление: отправка сообщения не ждет обработки. Если очередь заполнена, сообщение
+пропускается без обработки. Очередь разбирают ENRICH_WORKERS задач-обработчиков:
+
+- превью ссылок (не больше ENRICH_MAX_LINKS на сообщение);
+- упоминания пользователей (@имя);
+- фильтр запрещенных слов (CONTENT_FILTER_WORDS).
+
+Результаты кэшируются: превью по адресу ссылки, разбор текста по хэшу содержимого. Одну ссылку
+одновременно загружает только один обработчик. Если обработка что-то нашла, участникам
+переписки отправляется событие:
+
+    {'type': 'enrichment', 'message_id': <id>, 'room_id': <id, только для комнат>,
+     'links': [{'url', 'title', 'description', 'image'}], 'mentions': [<имя>],
+     'filtered_content': <текст со скрытыми словами>}
+
+Отсутствующие результаты в событие не включаются.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from app.chat.broadcast import send_to_users
+from app.enrichment.previews import httpx, fetch_preview
+from app.enrichment.processors import extract_links, extract_mentions, filter_content
+from app.rooms.membership import get_room_members
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Сообщения, ожидающие обработки
+_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ENRICH_QUEUE_SIZE)
+# Запущены ли обработчики (без них сообщения в очередь не ставятся)
+_running = False
+# Загрузки превью, которые сейчас выполняются: {url: future}
+_link_fetches: Dict[str, asyncio.Future] = {}
+
+
+class _ResultCache:
+    """
+    Кэш результатов с ограничением размера (LRU) и срока жизни записей.
+    """
+
+    def __init__(self):
+        self._items: "OrderedDict[str, Tuple[object, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, object]:
+        """:return: (найдено ли, значение)."""
+
+        cached = self._items.get(key)
+        if cached is None or time.monotonic() - cached[1] >= settings.ENRICH_CACHE_TTL:
+            return False, None
+        self._items.move_to_end(key)
+        return True, cached[0]
+
+    def set(self, key: str, value):
+        self._items[key] = (value, time.monotonic())
+        self._items.move_to_end(key)
+        while len(self._items) > settings.ENRICH_CACHE_SIZE:
+            self._items.popitem(last=False)
+
+
+# Превью по адресу ссылки (None — превью нет)
+link_cache = _ResultCache()
+# Разбор текста по SHA-256 содержимого: (упоминания, отфильтрованный текст или None)
+text_cache = _ResultCache()
+
+
+def submit_message(message) -> bool:
+    """
+    Поставить сообщение в очередь обработки, не дожидаясь ее.
+
+    :param message: Сохраненное сообщение.
+    :return: True, если сообщение принято в очередь.
+    """
+
+    if not _running:
+        return False
+    try:
+        _queue.put_nowait({
+            'id': message.id,
+            'sender_id': message.sender_id,
+            'recipient_id': message.recipient_id,
+            'room_id': message.room_id,
+            'content': message.content or '',
+        })
+    except asyncio.QueueFull:
+        logger.debug('Очередь обработки сообщений заполнена, сообщение %s пропущено', message.id)
+        return False
+    return True
+
+
+def analyze_text(content: str) -> Tuple[List[str], str | None]:
+    """
+    Найти упоминания и применить фильтр слов (с кэшем по хэшу содержимого).
+
+    :return: (упоминания, отфильтрованный текст или None).
+    """
+
+    key = hashlib.sha256(content.encode()).hexdigest()
+    found, result = text_cache.get(key)
+    if not found:
+        result = (extract_mentions(content), filter_content(content))
+        text_cache.set(key, result)
+    return result
+
+
+async def get_link_preview(client, url: str) -> dict | None:
+    """
+    Получить превью ссылки из кэша или загрузить его (одна загрузка на адрес).
+
+    Ошибки загрузки кэшируются как отсутствие превью.
+    """
+
+    found, preview = link_cache.get(url)
+    if found:
+        return preview
+    if client is None:
+        return None
+
+    fetch = _link_fetches.get(url)
+    if fetch is None:
+        fetch = _link_fetches[url] = asyncio.ensure_future(_fetch_and_cache(client, url))
+        fetch.add_done_callback(lambda _: _link_fetches.pop(url, None))
+    return await asyncio.shield(fetch)
+
+
+async def _fetch_and_cache(client, url: str) -> dict | None:
+    try:
+        preview = await fetch_preview(client, url)
+    except Exception as e:
+        logger.debug('Не удалось получить превью %s: %r', url, e)
+        preview = None
+    link_cache.set(url, preview)
+    return preview
+
+
+async def process_message(job: dict, client) -> dict | None:
+    """
+    Обработать сообщение и отправить результат участникам переписки.
+
+    :param job: Данные сообщения из очереди.
+    :param client: HTTP-клиент для загрузки превью (None — превью не строятся).
+    :return: Отправленное событие или None, если обработка ничего не нашла.
+    """
+
+    content = job['content']
+    mentions, filtered = analyze_text(content)
+    previews = await asyncio.gather(*(get_link_preview(client, url) for url in extract_links(content)))
+
+    update = {}
+    if previews := [preview for preview in previews if preview]:
+        update['links'] = previews
+    if mentions:
+        update['mentions'] = mentions
+    if filtered is not None:
+        update['filtered_content'] = filtered
+    if not update:
+        return None
+
+    event = {'type': 'enrichment', 'message_id': job['id'], **update}
+    if job['room_id'] is not None:
+        event['room_id'] = job['room_id']
+        recipients = await get_room_members(job['room_id'])
+    else:
+        recipients = {job['sender_id'], job['recipient_id']}
+
+    await send_to_users(recipients, event)
+    return event
+
+
+async def _worker(client):
+    while True:
+        job = await _queue.get()
+        try:
+            await process_message(job, client)
+        except Exception:
+            logger.exception('Ошибка обработки сообщения %s', job['id'])
+        finally:
+            _queue.task_done()
+
+
+async def run_enrichment_workers():
+    """Запустить обработчики очереди и работать до отмены задачи."""
+
+    global _running
+
+    client = None
+    if httpx is not None:
+        client = httpx.AsyncClient(
+            timeout=settings.ENRICH_FETCH_TIMEOUT, follow_redirects=False,
+            headers={'User-Agent': 'web-chat-link-preview/1.0'},
+        )
+
+    _running = True
+    try:
+        await asyncio.gather(*(_worker(client) for _ in range(settings.ENRICH_WORKERS)))
+    finally:
+        _running = False
+        if client is not None:
+            await client.aclose()
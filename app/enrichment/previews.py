@@ -0,0 +1,172 @@
+import asyncio
+import ipaddress
+import socket
+from html.parser import HTMLParser
+from typing import List
+from urllib.parse import SplitResult, urljoin, urlsplit, urlunsplit
+
+import anyio
+
+from config import settings
+
+try:
+    import httpx
+except ImportError:  # без httpx превью ссылок не строятся
+    httpx = None
+
+IPAddress = ipaddress.IPv4Address | ipaddress.IPv6Address
+
+
+class _PreviewParser(HTMLParser):
+    """
+    Собирает заголовок, описание и картинку страницы из <title> и мета-тегов Open Graph.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.title = ''
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._in_title = True
+        elif tag == 'meta':
+            attrs = dict(attrs)
+            key = (attrs.get('property') or attrs.get('name') or '').lower()
+            if key in ('og:title', 'og:description', 'og:image', 'description') and attrs.get('content'):
+                self.meta.setdefault(key, attrs['content'].strip())
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+
+def parse_preview(url: str, html: str) -> dict | None:
+    """
+    Построить превью страницы по ее HTML.
+
+    :param url: Адрес страницы (относительная ссылка на картинку разрешается от него).
+    :param html: Текст страницы.
+    :return: Словарь url, title, description, image или None, если заголовка и описания нет.
+    """
+
+    parser = _PreviewParser()
+    try:
+        parser.feed(html)
+    except Exception:
+        return None
+
+    title = parser.meta.get('og:title') or parser.title.strip()
+    description = parser.meta.get('og:description') or parser.meta.get('description')
+    if not title and not description:
+        return None
+
+    image = parser.meta.get('og:image')
+    return {
+        'url': url,
+        'title': title[:300] or None,
+        'description': description[:500] if description else None,
+        'image': urljoin(url, image) if image else None,
+    }
+
+
+async def resolve_host(host: str) -> List[IPAddress]:
+    """
+    Разрешить имя хоста в адреса.
+
+    :return: Адреса хоста (пустой список, если имя не разрешается).
+    """
+
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    except OSError:
+        return []
+    return list(dict.fromkeys(ipaddress.ip_address(info[4][0]) for info in infos))
+
+
+def pinned_url(parts: SplitResult, address: IPAddress) -> str:
+    """
+    Адрес страницы, в котором имя хоста заменено проверенным IP-адресом.
+
+    Так HTTP-клиент не разрешает имя повторно: иначе DNS мог бы вернуть ему другой,
+    внутренний адрес (DNS rebinding) уже после проверки.
+    """
+
+    host = f'[{address}]' if address.version == 6 else str(address)
+    if parts.port:
+        host = f'{host}:{parts.port}'
+    return urlunsplit((parts.scheme, host, parts.path, parts.query, ''))
+
+
+async def fetch_preview(client: "httpx.AsyncClient", url: str) -> dict | None:
+    """
+    Загрузить страницу и построить ее превью.
+
+    Читается не больше ENRICH_MAX_FETCH_BYTES, редиректы проверяются на каждом шаге.
+    Имя хоста разрешается один раз, и соединение устанавливается с проверенным адресом
+    (заголовок Host и имя для TLS остаются исходными).
+
+    :param client: HTTP-клиент.
+    :param url: Ссылка из сообщения.
+    :return: Превью или None, если страница недоступна или не является HTML.
+    """
+
+    target = url
+    for _ in range(settings.ENRICH_MAX_REDIRECTS + 1):
+        parts = urlsplit(target)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return None
+        # Все адреса хоста должны быть публичными (не loopback, не частная сеть и т.п.):
+        # пользователи не должны заставлять сервер обращаться к внутренним сервисам
+        addresses = await resolve_host(parts.hostname)
+        if not settings.ENRICH_ALLOW_PRIVATE_HOSTS and not all(address.is_global for address in addresses):
+            return None
+
+        response = None
+        for address in addresses:
+            try:
+                response = await client.send(
+                    client.build_request(
+                        'GET', pinned_url(parts, address),
+                        headers={'Host': parts.netloc.rpartition('@')[2]},
+                        extensions={'sni_hostname': parts.hostname},
+                    ),
+                    stream=True,
+                )
+                break
+            except httpx.ConnectError:
+                # Адрес недоступен (например, IPv6 без маршрута): пробуем следующий
+                continue
+        if response is None:
+            return None
+
+        try:
+            if response.is_redirect and 'location' in response.headers:
+                target = urljoin(target, response.headers['location'])
+                continue
+            if response.status_code != 200 or 'text/html' not in response.headers.get('content-type', ''):
+                return None
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= settings.ENRICH_MAX_FETCH_BYTES:
+                    break
+            encoding = response.charset_encoding or 'utf-8'
+        finally:
+            await response.aclose()
+
+        html = bytes(body[:settings.ENRICH_MAX_FETCH_BYTES]).decode(encoding, errors='replace')
+        # Разбор HTML занимает заметное время, поэтому выполняется вне цикла событий
+        preview = await anyio.to_thread.run_sync(parse_preview, target, html)
+        if preview is not None:
+            # Клиент сопоставляет превью со ссылкой из текста, а не с адресом после редиректов
+            preview['url'] = url
+        return preview
+
+    return None
@@ -0,0 +1,59 @@
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+from config import settings
+
+
+URL_RE = re.compile(r'https?://[^\s<>"\']+', re.IGNORECASE)
+MENTION_RE = re.compile(r'(?<![\w@])@(\w{3,50})')
+
+
+def extract_links(content: str) -> List[str]:
+    """
+    Найти ссылки в тексте сообщения.
+
+    :param content: Текст сообщения.
+    :return: Уникальные ссылки в порядке появления, не больше ENRICH_MAX_LINKS.
+    """
+
+    links = []
+    for match in URL_RE.finditer(content):
+        url = match.group(0).rstrip('.,;:!?)')
+        if url not in links:
+            links.append(url)
+        if len(links) >= settings.ENRICH_MAX_LINKS:
+            break
+    return links
+
+
+def extract_mentions(content: str) -> List[str]:
+    """
+    Найти упоминания пользователей (@имя).
+
+    :param content: Текст сообщения.
+    :return: Уникальные имена без '@' в порядке появления.
+    """
+
+    return list(dict.fromkeys(MENTION_RE.findall(content)))
+
+
+@lru_cache(maxsize=4)
+def _filter_pattern(words: Tuple[str, ...]) -> re.Pattern:
+    return re.compile(r'\b(' + '|'.join(re.escape(word) for word in words) + r')\b', re.IGNORECASE)
+
+
+def filter_content(content: str) -> str | None:
+    """
+    Скрыть запрещенные слова из CONTENT_FILTER_WORDS.
+
+    :param content: Текст сообщения.
+    :return: Текст с замененными словами или None, если запрещенных слов нет.
+    """
+
+    if not settings.CONTENT_FILTER_WORDS:
+        return None
+
+    pattern = _filter_pattern(tuple(settings.CONTENT_FILTER_WORDS))
+    filtered, count = pattern.subn(lambda match: '*' * len(match.group(0)), content)
+    return filtered if count else None
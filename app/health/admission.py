@@ -0,0 +1,70 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.health.loopmonitor import monitor
+
+
+class AdmissionControlMiddleware:
+    """
+    Отклонение новых запросов при перегрузке воркера.
+
+    Если устойчивая задержка цикла событий (скользящее среднее, см. LoopMonitor.sustained_lag)
+    больше max_lag или одновременно обрабатывается max_inflight
+    HTTP-запросов, новые HTTP-запросы получают 503 с Retry-After, а новые WebSocket-подключения
+    отклоняются до установления соединения. Уже подключенные пользователи продолжают работать:
+    воркер не берет на себя новую нагрузку, пока не справится с текущей.
+
+    Пути из exempt_paths (проверки здоровья) пропускаются всегда.
+    """
+
+    def __init__(self, app: ASGIApp, max_lag: float, max_inflight: int = 0, retry_after: int = 1,
+                 exempt_paths: tuple = ('/health',)):
+        self.app = app
+        self.max_lag = max_lag
+        self.max_inflight = max_inflight
+        self.retry_after = retry_after
+        self.exempt_paths = tuple(exempt_paths)
+        # Количество HTTP-запросов, которые сейчас обрабатываются
+        self.inflight = 0
+
+    def overloaded(self) -> bool:
+        if self.max_inflight and self.inflight >= self.max_inflight:
+            return True
+        return monitor.sustained_lag() > self.max_lag
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] not in ('http', 'websocket') or scope['path'].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        if self.overloaded():
+            if scope['type'] == 'http':
+                await self.reject_http(send)
+            else:
+                await self.reject_websocket(scope, receive, send)
+            return
+
+        if scope['type'] == 'websocket':
+            await self.app(scope, receive, send)
+            return
+
+        self.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight -= 1
+
+    def _headers(self) -> list:
+        return [(b'retry-after', str(self.retry_after).encode()), (b'content-length', b'0')]
+
+    async def reject_http(self, send: Send):
+        await send({'type': 'http.response.start', 'status': 503, 'headers': self._headers()})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def reject_websocket(self, scope: Scope, receive: Receive, send: Send):
+        await receive()  # websocket.connect
+        if 'websocket.http.response' in scope.get('extensions', {}):
+            await send({'type': 'websocket.http.response.start', 'status': 503, 'headers': self._headers()})
+            await send({'type': 'websocket.http.response.body', 'body': b''})
+        else:
+            # Сервер не поддерживает ответ HTTP на рукопожатие: закрываем с 1013 (try again later)
+            await send({'type': 'websocket.close', 'code': 1013})
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import uuid
+
+import uvicorn
+from sqlalchemy import select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.chat.codec import wait_for_pending_sends
+from app.chat.connections import WORKER_ID, active_connections, last_activity, close_quietly
+from app.chat.events import flush_read_marks
+from app.chat.models import Message
+from app.users.dao import UserDAO
+from app.users.models import User
+from config import settings
+from database import engine
+
+
+logger = logging.getLogger(__name__)
+
+
+class LifecycleState:
+    """
+    Состояние жизненного цикла воркера.
+    """
+
+    def __init__(self):
+        # Прогрев завершен, воркер готов принимать трафик
+        self.ready = False
+        # Принимаются ли новые WebSocket-подключения
+        self.accepting = True
+        # Задача плавной остановки (создается один раз)
+        self.drain_task: asyncio.Task | None = None
+
+
+state = LifecycleState()
+
+
+def warmup_statements() -> list:
+    """
+    Запросы горячего пути: выполняются на каждом соединении пула, чтобы asyncpg
+    подготовил их заранее, а SQLAlchemy закэшировал компиляцию.
+
+    :return: Список запросов.
+    """
+
+    some_id = uuid.UUID(int=0)
+    return [
+        select(User).filter_by(id=some_id),
+        select(User).filter_by(email=''),
+        select(User).filter_by(),
+        select(User).filter(User.id != some_id),
+        select(Message).filter(
+            or_(
+                and_(Message.sender_id == some_id, Message.recipient_id == some_id),
+                and_(Message.sender_id == some_id, Message.recipient_id == some_id)
+            )
+        ).order_by(Message.id),
+    ]
+
+
+async def warmup_database():
+    """
+    Заполнить пул соединений и подготовить запросы горячего пути.
+
+    Соединения открываются одновременно, поэтому пул создает их все сразу.
+    """
+
+    async def prime_connection():
+        async with engine.connect() as connection:
+            session = AsyncSession(bind=connection)
+            for statement in warmup_statements():
+                await session.execute(statement)
+            await session.close()
+
+    await asyncio.gather(*(prime_connection() for _ in range(settings.DB_POOL_SIZE)))
+
+
+async def warmup(retry_interval: float = 1):
+    """
+    Выполнять прогрев до успеха, после чего отметить воркер готовым.
+
+    :param retry_interval: Пауза между попытками в секундах.
+    """
+
+    while True:
+        try:
+            await warmup_database()
+            break
+        except Exception:
+            logger.exception('Прогрев не удался, повтор через %s с', retry_interval)
+            await asyncio.sleep(retry_interval)
+
+    state.ready = True
+    logger.info('Прогрев завершен, воркер готов')
+
+
+async def _drain():
+    state.ready = False
+    state.accepting = False
+
+    if not await wait_for_pending_sends(settings.SHUTDOWN_DRAIN_TIMEOUT):
+        logger.warning('Не все отправки завершились за %s с', settings.SHUTDOWN_DRAIN_TIMEOUT)
+
+    connections = list(active_connections.items())
+    active_connections.clear()
+    last_activity.clear()
+
+    # 1001 (going away): клиент переподключится к другому воркеру
+    await asyncio.gather(*(close_quietly(websocket, code=1001) for _, websocket in connections))
+
+    try:
+        await UserDAO.set_offline([user_id for user_id, _ in connections], worker_id=WORKER_ID)
+    except Exception:
+        logger.exception('Не удалось сбросить статусы присутствия при остановке')
+
+    try:
+        await flush_read_marks()
+    except Exception:
+        logger.exception('Не удалось записать отметки о прочтении при остановке')
+
+    logger.info('Остановка: закрыто WebSocket-соединений: %d', len(connections))
+
+
+async def drain():
+    """
+    Плавно остановить работу с клиентами.
+
+    Перестает принимать WebSocket-подключения, дожидается текущих отправок (не дольше
+    SHUTDOWN_DRAIN_TIMEOUT), закрывает соединения кадром закрытия, одним запросом
+    сбрасывает статусы присутствия и записывает накопленные отметки о прочтении.
+    Повторные вызовы ждут завершения первого.
+    """
+
+    if state.drain_task is None:
+        state.drain_task = asyncio.create_task(_drain())
+    await asyncio.shield(state.drain_task)
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    Сервер uvicorn, который перед остановкой вызывает drain().
+
+    Обычный uvicorn сначала обрывает WebSocket-соединения и только потом отправляет
+    приложению событие shutdown, поэтому закрыть их корректно из lifespan уже нельзя.
+    """
+
+    async def shutdown(self, sockets=None):
+        try:
+            await drain()
+        except Exception:
+            logger.exception('Ошибка плавной остановки')
+        await super().shutdown(sockets=sockets)
@@ -0,0 +1,113 @@
+"""
+Контроль задержки цикла событий.
+
+Фоновая задача раз в LOOP_LAG_INTERVAL засыпает и измеряет, насколько позже срока она проснулась:
+это и есть задержка цикла, с которой ждут своей очереди все запросы и отправки в WebSocket воркера.
+Сторожевой поток следит за отметками задачи. Если отметки нет дольше LOOP_BLOCK_THRESHOLD,
+цикл занят синхронным кодом (например, bcrypt), и поток пишет в лог текущий стек потока цикла.
+Так в логе оказывается строка, которая блокирует цикл.
+
+Для контроля нагрузки используется скользящее среднее задержки (sustained_lag): разовая
+блокировка (например, одна проверка пароля bcrypt) его почти не сдвигает, а устойчивая
+задержка поднимает до своего уровня за несколько замеров.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """
+    Измеритель задержки цикла событий со сторожевым потоком.
+    """
+
+    def __init__(self):
+        # Последняя измеренная задержка (секунды)
+        self.lag = 0.0
+        # Экспоненциальное скользящее среднее задержки (секунды)
+        self.average_lag = 0.0
+        # Время последней отметки задачи-измерителя по time.monotonic()
+        self.heartbeat = time.monotonic()
+        # Поток, в котором работает цикл событий
+        self.loop_thread_id: int | None = None
+        self._stopped = threading.Event()
+        self._reported_heartbeat: float | None = None
+
+    def current_lag(self) -> float:
+        """
+        Текущая задержка цикла.
+
+        Учитывает и время с последней отметки: сразу после долгой блокировки измеритель еще
+        не успел проснуться, но задержка уже известна.
+
+        :return: Задержка в секундах.
+        """
+
+        overdue = time.monotonic() - self.heartbeat - settings.LOOP_LAG_INTERVAL
+        return max(self.lag, overdue)
+
+    def sustained_lag(self) -> float:
+        """
+        Устойчивая задержка цикла: скользящее среднее замеров с весом LOOP_LAG_SMOOTHING.
+
+        :return: Задержка в секундах.
+        """
+
+        return self.average_lag
+
+    async def run(self):
+        """Измерять задержку цикла, пока задача не будет отменена."""
+
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self._stopped.clear()
+        threading.Thread(target=self._watch, name='loop-watchdog', daemon=True).start()
+
+        interval = settings.LOOP_LAG_INTERVAL
+        try:
+            while True:
+                started = time.monotonic()
+                await asyncio.sleep(interval)
+                now = time.monotonic()
+                self.lag = max(0.0, now - started - interval)
+                self.average_lag += settings.LOOP_LAG_SMOOTHING * (self.lag - self.average_lag)
+                self.heartbeat = now
+                if self.lag > settings.LOOP_BLOCK_THRESHOLD:
+                    logger.warning('Цикл событий был заблокирован %.2f с', self.lag)
+        finally:
+            self._stopped.set()
+
+    def _watch(self):
+        threshold = settings.LOOP_BLOCK_THRESHOLD
+        while not self._stopped.wait(threshold / 2):
+            heartbeat = self.heartbeat
+            blocked = time.monotonic() - heartbeat
+            # Стек пишется один раз на блокировку
+            if blocked < threshold or heartbeat == self._reported_heartbeat:
+                continue
+            self._reported_heartbeat = heartbeat
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '(стек недоступен)\n'
+            logger.warning('Цикл событий заблокирован уже %.2f с, стек потока цикла:\n%s', blocked, stack)
+
+
+monitor = LoopMonitor()
+
+
+def start_loop_monitor() -> asyncio.Task:
+    """
+    Запустить измеритель задержки цикла событий.
+
+    :return: Запущенная задача.
+    """
+
+    return asyncio.create_task(monitor.run(), name='loop-monitor')
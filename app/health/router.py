@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Response, status
+
+from app.health.lifecycle import state
+from app.health.loopmonitor import monitor
+
+
+router = APIRouter(prefix='/health', tags=['Health'])
+
+
+@router.get('/live', summary='Проверка жизнеспособности')
+async def liveness() -> dict:
+    """
+    Процесс запущен и обрабатывает запросы.
+    """
+
+    return {'status': 'ok'}
+
+
+@router.get('/ready', summary='Проверка готовности')
+async def readiness(response: Response) -> dict:
+    """
+    Воркер прогрет и не находится в процессе остановки.
+
+    Возвращает 503, пока прогрев не завершен или идет остановка.
+    В ответе также указываются текущая и средняя задержка цикла событий в секундах.
+    """
+
+    lags = {'loop_lag': round(monitor.current_lag(), 4), 'loop_lag_avg': round(monitor.sustained_lag(), 4)}
+    if not state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {'status': 'unavailable', **lags}
+    return {'status': 'ok', **lags}
@@ -0,0 +1,401 @@
+"""
+Массовая загрузка пользователей и сообщений из NDJSON или CSV через COPY.
+
+Файл читается потоком пачками по IMPORT_CHUNK_SIZE записей, каждая пачка передается в Postgres
+командой COPY и фиксируется отдельной транзакцией. Следующая пачка читается, пока загружается
+текущая. После каждой пачки число загруженных записей и смещение конца пачки в файле (в байтах)
+пишутся в файл контрольной точки. Повторный запуск с тем же файлом переходит к этому смещению,
+не разбирая уже загруженные записи заново. Первая пачка после продолжения
+загружается через временную таблицу с ON CONFLICT DO NOTHING: она могла быть записана
+до сбоя, хотя контрольная точка не успела обновиться.
+
+С --drop-indexes вторичные индексы таблицы удаляются перед загрузкой и создаются заново
+после нее. Их определения сохраняются в контрольной точке, поэтому прерванная загрузка
+восстановит индексы при продолжении. Индексы первичных ключей и ограничений не трогаются.
+
+Запуск: python -m app.importer.loader users users.ndjson
+        python -m app.importer.loader messages messages.csv --drop-indexes
+
+Поля записей совпадают с колонками таблиц. id обязателен: без него продолжение загрузки
+не было бы идемпотентным. Отсутствующие created_at и updated_at заполняются временем начала
+загрузки (UTC). Оно сохраняется в контрольной точке, и продолжение загрузки использует то же время.
+Сообщениям с id не версии 7 (например, UUIDv4 из старой системы) id пересчитывается из created_at
+так же, как в миграции c2a7e4f1d9b3: сортировка по id должна совпадать с хронологической.
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import asyncpg
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def _uuid(value) -> uuid.UUID | None:
+    return uuid.UUID(str(value)) if value not in (None, '') else None
+
+
+def _text(value) -> str | None:
+    return str(value) if value is not None else None
+
+
+def _bool(value) -> bool | None:
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 't', 'yes')
+
+
+def _datetime(value) -> datetime | None:
+    if value in (None, ''):
+        return None
+    parsed = datetime.fromisoformat(str(value))
+    # Колонки без часового пояса: время с поясом приводится к UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# Колонки загружаемых таблиц и преобразование значений из исходного файла
+TABLE_COLUMNS: Dict[str, Dict[str, Callable]] = {
+    'users': {
+        'id': _uuid,
+        'name': _text,
+        'hashed_password': _text,
+        'email': _text,
+        'online_status': _bool,
+        'created_at': _datetime,
+        'updated_at': _datetime,
+    },
+    'messages': {
+        'id': _uuid,
+        'sender_id': _uuid,
+        'recipient_id': _uuid,
+        'room_id': _uuid,
+        'content': _text,
+        'attachment_id': _uuid,
+        'created_at': _datetime,
+        'updated_at': _datetime,
+    },
+}
+
+def uuid7_from_created_at(source: uuid.UUID, created_at: datetime) -> uuid.UUID:
+    """
+    Построить UUIDv7 из времени создания и случайной части исходного id.
+
+    То же построение, что UUID7_FROM_CREATED_AT в миграции c2a7e4f1d9b3: 48 бит миллисекунд
+    created_at (время без пояса считается UTC) и младшие 80 бит исходного id с битами версии
+    и варианта. Одинаковый исходный id дает одинаковый результат, поэтому продолжение загрузки
+    остается идемпотентным.
+    """
+
+    milliseconds = int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    value = milliseconds << 80 | source.int & ((1 << 80) - 1)
+    value = value & ~(0xF << 76) | (0x7 << 76)  # версия
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # вариант RFC 9562
+    return uuid.UUID(int=value)
+
+
+# Значения по умолчанию для отсутствующих полей (None — оставить NULL)
+TABLE_DEFAULTS: Dict[str, Dict[str, object]] = {
+    'users': {'online_status': False},
+    'messages': {},
+}
+
+
+def read_records(path: str, file_format: str, offset: int = 0) -> Iterator[Tuple[dict, int]]:
+    """
+    Читать записи из файла по одной.
+
+    Файл читается в двоичном режиме построчно, чтобы знать смещение конца каждой записи.
+
+    :param path: Путь к файлу.
+    :param file_format: 'ndjson' или 'csv' (с заголовком).
+    :param offset: Смещение в байтах, с которого начинать (конец ранее прочитанной записи).
+    :return: Пары (запись, смещение конца записи).
+    """
+
+    with open(path, 'rb') as f:
+        if file_format != 'csv':
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                if line.strip():
+                    yield json.loads(line), offset
+            return
+
+        position = 0
+
+        def lines() -> Iterator[str]:
+            # csv.reader берет строки по одной и не читает дальше конца текущей записи,
+            # поэтому после каждой записи position указывает на ее конец (запись может занимать
+            # несколько строк, если в значениях в кавычках есть переводы строк)
+            nonlocal position
+            for line in f:
+                position += len(line)
+                yield line.decode('utf-8')
+
+        reader = csv.reader(lines())
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return
+        if offset > position:
+            f.seek(offset)
+            position = offset
+            reader = csv.reader(lines())
+        for row in reader:
+            if row:
+                yield dict(zip(fieldnames, row)), position
+
+
+def to_row(table: str, record: dict, started_at: datetime) -> tuple:
+    """
+    Преобразовать запись файла в строку для COPY.
+
+    :raises ValueError: Если в записи нет id.
+    """
+
+    row = []
+    for column, convert in TABLE_COLUMNS[table].items():
+        value = convert(record.get(column))
+        if value is None:
+            value = started_at if column in ('created_at', 'updated_at') else TABLE_DEFAULTS[table].get(column)
+        row.append(value)
+    if row[0] is None:
+        raise ValueError(f'Запись без id: {record!r}')
+    if table == 'messages' and row[0].version != 7:
+        row[0] = uuid7_from_created_at(row[0], row[list(TABLE_COLUMNS[table]).index('created_at')])
+    return tuple(row)
+
+
+def read_chunk(records: Iterator[Tuple[dict, int]], table: str, size: int,
+               started_at: datetime) -> Tuple[List[tuple], int | None]:
+    """
+    Прочитать следующую пачку строк.
+
+    :return: Строки (пустой список в конце файла) и смещение конца последней из них в файле.
+    """
+
+    chunk = []
+    offset = None
+    for record, offset in records:
+        chunk.append(to_row(table, record, started_at))
+        if len(chunk) >= size:
+            break
+    return chunk, offset
+
+
+def skip_records(records: Iterator[Tuple[dict, int]], count: int) -> int:
+    """
+    Пропустить уже загруженные записи (для контрольных точек без смещения в файле).
+
+    :return: Сколько записей пропущено.
+    """
+
+    skipped = 0
+    if count <= 0:
+        return skipped
+    for _ in records:
+        skipped += 1
+        if skipped >= count:
+            break
+    return skipped
+
+
+def load_checkpoint(path: str) -> dict | None:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    """Записать контрольную точку атомарно (через временный файл)."""
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+async def connect() -> asyncpg.Connection:
+    return await asyncpg.connect(
+        host=settings.DB_HOST, port=settings.DB_PORT, database=settings.DB_NAME,
+        user=settings.DB_USER, password=settings.DB_PASSWORD,
+    )
+
+
+async def secondary_indexes(connection: asyncpg.Connection, table: str) -> List[Tuple[str, str]]:
+    """
+    Вторичные индексы таблицы: не первичный ключ и не индексы ограничений.
+
+    :return: Пары (имя индекса, определение CREATE INDEX).
+    """
+
+    rows = await connection.fetch(
+        """
+        SELECT i.relname AS name, pg_get_indexdef(ix.indexrelid) AS definition
+        FROM pg_index ix
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        WHERE ix.indrelid = $1::regclass
+          AND NOT ix.indisprimary
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = ix.indexrelid)
+        """,
+        table,
+    )
+    return [(row['name'], row['definition']) for row in rows]
+
+
+async def drop_indexes(connection: asyncpg.Connection, indexes: List[Tuple[str, str]]):
+    for name, _ in indexes:
+        await connection.execute(f'DROP INDEX IF EXISTS "{name}"')
+    logger.info('Удалено индексов: %d', len(indexes))
+
+
+async def rebuild_indexes(connection: asyncpg.Connection, table: str, indexes: List[Tuple[str, str]]):
+    for name, definition in indexes:
+        started = time.monotonic()
+        await connection.execute(definition.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1))
+        logger.info('Индекс %s создан за %.1f с', name, time.monotonic() - started)
+    await connection.execute(f'ANALYZE "{table}"')
+
+
+async def copy_chunk(connection: asyncpg.Connection, table: str, rows: List[tuple], skip_existing: bool):
+    """
+    Загрузить пачку строк одной транзакцией.
+
+    :param skip_existing: Загрузить через временную таблицу, пропуская строки с уже существующим id.
+    """
+
+    columns = list(TABLE_COLUMNS[table])
+    async with connection.transaction():
+        if not skip_existing:
+            await connection.copy_records_to_table(table, records=rows, columns=columns)
+            return
+
+        column_list = ', '.join(columns)
+        # Только загружаемые колонки: LIKE скопировал бы NOT NULL остальных колонок без их
+        # значений по умолчанию (например, users.is_admin), и COPY в staging-таблицу падал бы
+        await connection.execute(
+            f'CREATE TEMP TABLE import_stage ON COMMIT DROP AS SELECT {column_list} FROM "{table}" WITH NO DATA'
+        )
+        await connection.copy_records_to_table('import_stage', records=rows, columns=columns)
+        await connection.execute(
+            f'INSERT INTO "{table}" ({column_list}) SELECT {column_list} FROM import_stage ON CONFLICT (id) DO NOTHING'
+        )
+
+
+async def load(table: str, path: str, file_format: str, chunk_size: int = settings.IMPORT_CHUNK_SIZE,
+               drop_secondary_indexes: bool = False, checkpoint_path: str | None = None) -> int:
+    """
+    Загрузить файл в таблицу.
+
+    :param table: 'users' или 'messages'.
+    :param path: Путь к исходному файлу.
+    :param file_format: 'ndjson' или 'csv'.
+    :param chunk_size: Размер пачки.
+    :param drop_secondary_indexes: Удалить вторичные индексы на время загрузки.
+    :param checkpoint_path: Файл контрольной точки (по умолчанию рядом с исходным файлом).
+    :return: Общее число загруженных записей.
+    """
+
+    checkpoint_path = checkpoint_path or f'{path}.{table}.checkpoint'
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is not None and (checkpoint['table'], checkpoint['source']) != (table, os.path.abspath(path)):
+        raise SystemExit(f'Контрольная точка {checkpoint_path} относится к другой загрузке')
+    resumed = checkpoint is not None
+    checkpoint = checkpoint or {
+        'table': table, 'source': os.path.abspath(path), 'rows': 0, 'offset': 0, 'indexes': [],
+        # Время в бд хранится без пояса в UTC
+        'started_at': datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+    }
+
+    # id сообщений без created_at строятся из этого времени: при продолжении оно должно совпадать,
+    # иначе повторно загруженная строка получит другой id и не будет отсеяна ON CONFLICT (id)
+    if 'started_at' not in checkpoint:
+        # Контрольная точка записана до сохранения времени начала: записи без created_at,
+        # загруженные до сбоя, могут продублироваться
+        checkpoint['started_at'] = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+    started_at = datetime.fromisoformat(checkpoint['started_at'])
+    if resumed:
+        logger.info('Продолжение загрузки с записи %d', checkpoint['rows'])
+    if 'offset' in checkpoint:
+        records = read_records(path, file_format, checkpoint['offset'])
+    else:
+        # Контрольная точка записана до появления смещений: пропускаем записи разбором
+        records = read_records(path, file_format)
+        skip_records(records, checkpoint['rows'])
+
+    connection = await connect()
+    try:
+        if drop_secondary_indexes and not checkpoint['indexes']:
+            checkpoint['indexes'] = await secondary_indexes(connection, table)
+            save_checkpoint(checkpoint_path, checkpoint)
+            await drop_indexes(connection, checkpoint['indexes'])
+
+        started = time.monotonic()
+        loaded = 0
+        skip_existing = resumed
+        next_chunk = asyncio.to_thread(read_chunk, records, table, chunk_size, started_at)
+
+        rows, offset = await next_chunk
+        while rows:
+            # Следующая пачка читается и разбирается в потоке, пока текущая загружается
+            next_chunk = asyncio.ensure_future(asyncio.to_thread(read_chunk, records, table, chunk_size, started_at))
+            try:
+                await copy_chunk(connection, table, rows, skip_existing)
+            except BaseException:
+                # Поток чтения отменить нельзя: дожидаемся его, чтобы он не читал файл после выхода
+                with contextlib.suppress(BaseException):
+                    await next_chunk
+                raise
+            skip_existing = False
+
+            loaded += len(rows)
+            checkpoint['rows'] += len(rows)
+            checkpoint['offset'] = offset
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            elapsed = time.monotonic() - started
+            logger.info('%s: загружено %d (всего %d, %.0f записей/с)',
+                        table, loaded, checkpoint['rows'], loaded / elapsed if elapsed else 0)
+            rows, offset = await next_chunk
+
+        if checkpoint['indexes']:
+            await rebuild_indexes(connection, table, checkpoint['indexes'])
+    finally:
+        await connection.close()
+
+    os.remove(checkpoint_path)
+    logger.info('%s: загрузка завершена, всего %d записей', table, checkpoint['rows'])
+    return checkpoint['rows']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Массовая загрузка пользователей и сообщений через COPY')
+    parser.add_argument('table', choices=sorted(TABLE_COLUMNS), help='Таблица')
+    parser.add_argument('path', help='Файл NDJSON или CSV')
+    parser.add_argument('--format', choices=('ndjson', 'csv'), help='Формат (по умолчанию по расширению)')
+    parser.add_argument('--chunk-size', type=int, default=settings.IMPORT_CHUNK_SIZE, help='Записей в пачке')
+    parser.add_argument('--drop-indexes', action='store_true', help='Удалить вторичные индексы на время загрузки')
+    parser.add_argument('--checkpoint', help='Файл контрольной точки')
+    arguments = parser.parse_args()
+
+    file_format = arguments.format or ('csv' if arguments.path.lower().endswith('.csv') else 'ndjson')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    asyncio.run(load(arguments.table, arguments.path, file_format, chunk_size=arguments.chunk_size,
+                     drop_secondary_indexes=arguments.drop_indexes, checkpoint_path=arguments.checkpoint))
@@ -14,7 +14,9 @@ from alembic import context
 
 from database import Base, DATABASE_URL
 from app.users.models import User
-from app.chat.models import Message
+from app.chat.models import Message, ReadMark
+from app.rooms.models import Room, RoomMember
+from app.attachments.models import Attachment
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,30 @@
+"""messages created_at index
+
+Revision ID: 0f6c9a3b5d27
+Revises: b7f3d2e8c1a4
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f6c9a3b5d27'
+down_revision: Union[str, None] = 'b7f3d2e8c1a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # CONCURRENTLY не блокирует запись в messages, но не может выполняться в транзакции
+    with op.get_context().autocommit_block():
+        op.create_index('ix_messages_created_at_id', 'messages', ['created_at', 'id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_messages_created_at_id', table_name='messages', postgresql_concurrently=True)
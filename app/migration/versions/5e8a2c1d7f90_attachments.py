@@ -0,0 +1,43 @@
+"""attachments
+
+Revision ID: 5e8a2c1d7f90
+Revises: d41b7e9a0c35
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a2c1d7f90'
+down_revision: Union[str, None] = 'd41b7e9a0c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table('attachments',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('content_type', sa.String(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+    op.add_column('messages', sa.Column('attachment_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('messages_attachment_id_fkey', 'messages', 'attachments', ['attachment_id'], ['id'])
+    op.create_index(op.f('ix_messages_attachment_id'), 'messages', ['attachment_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_messages_attachment_id'), table_name='messages')
+    op.drop_constraint('messages_attachment_id_fkey', 'messages', type_='foreignkey')
+    op.drop_column('messages', 'attachment_id')
+    op.drop_table('attachments')
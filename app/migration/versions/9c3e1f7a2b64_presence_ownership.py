@@ -0,0 +1,31 @@
+"""presence ownership
+
+Revision ID: 9c3e1f7a2b64
+Revises: 4a0f89c5dccb
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e1f7a2b64'
+down_revision: Union[str, None] = '4a0f89c5dccb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('online_worker', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('online_seen_at', sa.DateTime(), nullable=True))
+
+    # Статусы, оставшиеся от прежних запусков, владельца не имеют — сбрасываем их
+    op.execute('UPDATE users SET online_status = false WHERE online_status')
+
+
+def downgrade():
+    op.drop_column('users', 'online_seen_at')
+    op.drop_column('users', 'online_worker')
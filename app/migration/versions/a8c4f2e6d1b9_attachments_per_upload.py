@@ -0,0 +1,32 @@
+"""attachments per upload
+
+Revision ID: a8c4f2e6d1b9
+Revises: e5d1a9c7b3f2
+Create Date: 2026-10-19 19:00:00.000000
+
+Вложение — запись на каждую загрузку со своими именем файла и MIME-типом. Общим остается
+только содержимое в хранилище (по SHA-256), поэтому уникальность sha256 снимается.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4f2e6d1b9'
+down_revision: Union[str, None] = 'e5d1a9c7b3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.drop_constraint('attachments_sha256_key', 'attachments', type_='unique')
+    op.create_index(op.f('ix_attachments_sha256'), 'attachments', ['sha256'], unique=False)
+
+
+def downgrade():
+    # Повторные загрузки одного содержимого не сливаются: вернуть уникальность можно,
+    # только если таких записей нет
+    op.drop_index(op.f('ix_attachments_sha256'), table_name='attachments')
+    op.create_unique_constraint('attachments_sha256_key', 'attachments', ['sha256'])
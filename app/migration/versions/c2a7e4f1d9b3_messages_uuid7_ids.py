@@ -0,0 +1,79 @@
+"""messages uuid7 ids
+
+Revision ID: c2a7e4f1d9b3
+Revises: 0f6c9a3b5d27
+Create Date: 2026-10-19 16:00:00.000000
+
+Новые записи получают id UUIDv7 (см. database.uuid7). Существующим сообщениям id
+пересчитываются из created_at, чтобы сортировка по id совпадала с хронологической
+и для старой истории. Случайная часть берется из прежнего UUIDv4, поэтому новые id
+уникальны. Отметки о прочтении переводятся на новые id. Остальные таблицы сохраняют
+свои id: порядок их записей не важен, а внешние ключи на них пришлось бы переписывать.
+
+Сообщения переписываются пачками по BATCH_SIZE строк в порядке (created_at, id), каждая пачка
+фиксируется отдельно, поэтому строки не блокируются надолго. Прерванную миграцию можно
+запустить снова: сообщения, у которых id уже версии 7, пропускаются.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a7e4f1d9b3'
+down_revision: Union[str, None] = '0f6c9a3b5d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# UUIDv7 из created_at (48 бит миллисекунд; время без пояса хранится в UTC, поэтому результат
+# не зависит от TimeZone сессии) и 74 случайных бит прежнего UUIDv4
+UUID7_FROM_CREATED_AT = """(
+    lpad(to_hex(floor(extract(epoch FROM created_at AT TIME ZONE 'UTC') * 1000)::bigint), 12, '0')
+    || '7' || substr(replace(id::text, '-', ''), 14, 3)
+    || to_hex(8 | (('x' || substr(replace(id::text, '-', ''), 17, 1))::bit(4)::int & 3))
+    || substr(replace(id::text, '-', ''), 18, 15)
+)::uuid"""
+
+
+BATCH_SIZE = 10000
+
+# Одна пачка: сообщения с id не версии 7 начиная с created_at >= :after. Уже переписанные
+# строки на границе пачек отсекаются условием на версию. Отметки о прочтении переводятся
+# на новые id тем же запросом
+REWRITE_BATCH = sa.text(f"""
+    WITH batch AS (
+        SELECT id AS old_id, {UUID7_FROM_CREATED_AT} AS new_id
+        FROM messages
+        WHERE created_at >= :after AND substr(id::text, 15, 1) <> '7'
+        ORDER BY created_at, id
+        LIMIT :batch_size
+    ), marks AS (
+        UPDATE read_marks SET last_read_message_id = batch.new_id
+        FROM batch WHERE read_marks.last_read_message_id = batch.old_id
+    )
+    UPDATE messages SET id = batch.new_id
+    FROM batch WHERE messages.id = batch.old_id
+    RETURNING messages.created_at
+""")
+
+
+def upgrade():
+    connection = op.get_bind()
+    after = connection.scalar(sa.text("SELECT min(created_at) FROM messages WHERE substr(id::text, 15, 1) <> '7'"))
+    if after is None:
+        return
+
+    # Каждая пачка фиксируется сразу, а не в общей транзакции миграции
+    with op.get_context().autocommit_block():
+        while True:
+            rewritten = connection.execute(REWRITE_BATCH, {'after': after, 'batch_size': BATCH_SIZE}).scalars().all()
+            if not rewritten:
+                break
+            after = max(rewritten)
+
+
+def downgrade():
+    # Пересчитанные id остаются корректными UUID, прежние значения не восстанавливаются
+    pass
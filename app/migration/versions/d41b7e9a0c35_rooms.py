@@ -0,0 +1,63 @@
+"""rooms
+
+Revision ID: d41b7e9a0c35
+Revises: 9c3e1f7a2b64
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41b7e9a0c35'
+down_revision: Union[str, None] = '9c3e1f7a2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table('rooms',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_table('room_members',
+    sa.Column('room_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id'),
+    sa.UniqueConstraint('room_id', 'user_id')
+    )
+    op.create_index(op.f('ix_room_members_user_id'), 'room_members', ['user_id'], unique=False)
+
+    op.add_column('messages', sa.Column('room_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('messages_room_id_fkey', 'messages', 'rooms', ['room_id'], ['id'], ondelete='CASCADE')
+    op.create_index(op.f('ix_messages_room_id'), 'messages', ['room_id'], unique=False)
+    op.alter_column('messages', 'recipient_id', nullable=True)
+    op.create_check_constraint('ck_messages_single_target', 'messages', '(recipient_id IS NULL) <> (room_id IS NULL)')
+
+
+def downgrade():
+    op.execute('DELETE FROM messages WHERE room_id IS NOT NULL')
+    op.drop_constraint('ck_messages_single_target', 'messages', type_='check')
+    op.alter_column('messages', 'recipient_id', nullable=False)
+    op.drop_index(op.f('ix_messages_room_id'), table_name='messages')
+    op.drop_constraint('messages_room_id_fkey', 'messages', type_='foreignkey')
+    op.drop_column('messages', 'room_id')
+
+    op.drop_index(op.f('ix_room_members_user_id'), table_name='room_members')
+    op.drop_table('room_members')
+    op.drop_table('rooms')
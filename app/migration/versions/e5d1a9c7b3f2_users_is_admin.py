@@ -0,0 +1,31 @@
+"""users is_admin
+
+Revision ID: e5d1a9c7b3f2
+Revises: c2a7e4f1d9b3
+Create Date: 2026-10-19 18:00:00.000000
+
+Право администратора хранится в users.is_admin и выдается вне приложения, например:
+
+    UPDATE users SET is_admin = true WHERE id = '<id пользователя>';
+
+Через API его получить нельзя: регистрация всегда создает обычного пользователя.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5d1a9c7b3f2'
+down_revision: Union[str, None] = 'c2a7e4f1d9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    op.drop_column('users', 'is_admin')
@@ -0,0 +1,53 @@
+import math
+
+from fastapi import Request, Depends
+
+from app.ratelimit.limiter import get_bucket_store
+from app.users.dependencies import get_current_user
+from app.users.models import User
+from exceptions import TooManyRequestsException
+
+
+async def _consume(key: tuple, rate: float, burst: int):
+    """
+    Списать токен из корзины или выбросить исключение 429.
+
+    :raises TooManyRequestsException: Если корзина пуста.
+    """
+
+    retry_after = await get_bucket_store().consume(key, rate=rate, capacity=burst)
+    if retry_after:
+        raise TooManyRequestsException(retry_after=math.ceil(retry_after))
+
+
+def rate_limit_by_ip(scope: str, rate: float, burst: int):
+    """
+    Создает зависимость, ограничивающую частоту запросов с одного IP-адреса.
+
+    :param scope: Название области ограничения (у каждой области свои корзины).
+    :param rate: Скорость пополнения, запросов в секунду.
+    :param burst: Допустимый всплеск запросов.
+    :return: Зависимость FastAPI.
+    """
+
+    async def dependency(request: Request):
+        host = request.client.host if request.client else ''
+        await _consume((scope, host), rate, burst)
+
+    return dependency
+
+
+def rate_limit_by_user(scope: str, rate: float, burst: int):
+    """
+    Создает зависимость, ограничивающую частоту запросов текущего пользователя.
+
+    :param scope: Название области ограничения (у каждой области свои корзины).
+    :param rate: Скорость пополнения, запросов в секунду.
+    :param burst: Допустимый всплеск запросов.
+    :return: Зависимость FastAPI.
+    """
+
+    async def dependency(current_user: User = Depends(get_current_user)):
+        await _consume((scope, current_user.id), rate, burst)
+
+    return dependency
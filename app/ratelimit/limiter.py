@@ -0,0 +1,101 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Hashable
+
+from config import settings
+
+
+class Bucket:
+    """
+    Корзина токенов: текущий запас, время последнего пополнения и момент полного заполнения.
+    """
+
+    __slots__ = ('tokens', 'updated', 'full_at')
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.full_at = updated
+
+
+class BucketStore(ABC):
+    """
+    Базовый класс хранилища корзин.
+
+    Реализация, разделяемая между воркерами (например, в Redis), должна переопределить consume.
+    """
+
+    @abstractmethod
+    async def consume(self, key: Hashable, rate: float, capacity: int, cost: float = 1) -> float:
+        """
+        Списать токены из корзины.
+
+        :param key: Ключ корзины (область и идентификатор клиента).
+        :param rate: Скорость пополнения, токенов в секунду.
+        :param capacity: Емкость корзины.
+        :param cost: Стоимость запроса в токенах.
+        :return: 0, если запрос разрешен, иначе число секунд до появления нужного количества токенов.
+        """
+
+
+class InMemoryBucketStore(BucketStore):
+    """
+    Хранилище корзин в памяти процесса.
+
+    Корзины, простаивавшие достаточно долго, чтобы заполниться до конца, ничем не отличаются
+    от новых, поэтому периодически удаляются.
+    """
+
+    def __init__(self, sweep_interval: float = settings.RATE_LIMIT_SWEEP_INTERVAL):
+        self.buckets: Dict[Hashable, Bucket] = {}
+        self.sweep_interval = sweep_interval
+        self.next_sweep = time.monotonic() + sweep_interval
+
+    async def consume(self, key: Hashable, rate: float, capacity: int, cost: float = 1) -> float:
+        now = time.monotonic()
+        if now >= self.next_sweep:
+            self.sweep(now)
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = Bucket(capacity, now)
+        else:
+            bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+
+        if bucket.tokens < cost:
+            return (cost - bucket.tokens) / rate
+
+        bucket.tokens -= cost
+        bucket.full_at = now + (capacity - bucket.tokens) / rate
+        return 0
+
+    def sweep(self, now: float):
+        """
+        Удалить корзины, которые к текущему моменту уже заполнились.
+
+        :param now: Текущее время по time.monotonic().
+        """
+
+        self.buckets = {key: bucket for key, bucket in self.buckets.items() if bucket.full_at > now}
+        self.next_sweep = now + self.sweep_interval
+
+
+bucket_store: BucketStore = InMemoryBucketStore()
+
+
+def set_bucket_store(store: BucketStore):
+    """
+    Заменить хранилище корзин (например, на общее для нескольких воркеров).
+
+    :param store: Новое хранилище.
+    """
+
+    global bucket_store
+    bucket_store = store
+
+
+def get_bucket_store() -> BucketStore:
+    """Вернуть текущее хранилище корзин."""
+
+    return bucket_store
@@ -0,0 +1,105 @@
+import uuid
+from typing import Iterable
+
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+
+from app.dao.base import BaseDAO
+from app.rooms.models import Room, RoomMember
+from database import async_session_maker, uuid7
+
+
+class RoomDAO(BaseDAO):
+    """
+    Класс для запросов к бд комнат.
+    """
+
+    model = Room
+
+    @classmethod
+    async def create_room(cls, name: str, owner_id: uuid.UUID, member_ids: Iterable[uuid.UUID]) -> Room:
+        """
+        Создать комнату вместе с участниками в одной транзакции.
+
+        :param name: Название комнаты.
+        :param owner_id: ID создателя (становится участником).
+        :param member_ids: ID остальных участников.
+        :return: Созданная комната.
+        """
+
+        members = {owner_id, *member_ids}
+        async with async_session_maker() as session:
+            async with session.begin():
+                room = Room(id=uuid7(), name=name, owner_id=owner_id)
+                session.add(room)
+                await session.flush()
+                session.add_all([RoomMember(id=uuid7(), room_id=room.id, user_id=user_id) for user_id in members])
+            return room
+
+    @classmethod
+    async def add_member(cls, room_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        """
+        Добавить участника в комнату.
+
+        :param room_id: ID комнаты.
+        :param user_id: ID пользователя.
+        :return: True, если участник добавлен, False, если он уже состоял в комнате.
+        """
+
+        async with async_session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    insert(RoomMember)
+                    .values(id=uuid7(), room_id=room_id, user_id=user_id)
+                    .on_conflict_do_nothing(index_elements=['room_id', 'user_id'])
+                )
+                return result.rowcount > 0
+
+    @classmethod
+    async def remove_member(cls, room_id: uuid.UUID, user_id: uuid.UUID) -> bool:
+        """
+        Удалить участника из комнаты.
+
+        :param room_id: ID комнаты.
+        :param user_id: ID пользователя.
+        :return: True, если участник был удален.
+        """
+
+        async with async_session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(RoomMember).where(RoomMember.room_id == room_id, RoomMember.user_id == user_id)
+                )
+                return result.rowcount > 0
+
+    @classmethod
+    async def get_member_ids(cls, room_id: uuid.UUID) -> frozenset:
+        """
+        Получить ID участников комнаты.
+
+        :param room_id: ID комнаты.
+        :return: Множество ID участников.
+        """
+
+        async with async_session_maker() as session:
+            result = await session.execute(select(RoomMember.user_id).where(RoomMember.room_id == room_id))
+            return frozenset(result.scalars().all())
+
+    @classmethod
+    async def list_user_rooms(cls, user_id: uuid.UUID):
+        """
+        Получить комнаты, в которых состоит пользователь.
+
+        :param user_id: ID пользователя.
+        :return: Список комнат.
+        """
+
+        async with async_session_maker() as session:
+            query = (
+                select(Room)
+                .join(RoomMember, RoomMember.room_id == Room.id)
+                .where(RoomMember.user_id == user_id)
+                .order_by(Room.created_at)
+            )
+            result = await session.execute(query)
+            return result.scalars().all()
@@ -0,0 +1,50 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Tuple
+
+from app.rooms.dao import RoomDAO
+from config import settings
+
+
+# Кэш участников комнат: {room_id: (участники, время загрузки по time.monotonic())}
+_members_cache: "OrderedDict[uuid.UUID, Tuple[frozenset, float]]" = OrderedDict()
+
+
+async def get_room_members(room_id: uuid.UUID) -> frozenset:
+    """
+    Получить участников комнаты из кэша или из бд.
+
+    Записи живут не дольше ROOM_MEMBERS_CACHE_TTL. Воркер, изменивший состав комнаты, сбрасывает
+    свою запись сразу (invalidate_room_members), а остальные воркеры до истечения срока
+    продолжают использовать прежний состав: удаленный участник еще до ROOM_MEMBERS_CACHE_TTL
+    секунд может получать сообщения комнаты. Срок поэтому короткий: кэш снимает нагрузку
+    при частых сообщениях, но не держит устаревший состав долго. Размер кэша ограничен
+    ROOM_MEMBERS_CACHE_SIZE.
+
+    :param room_id: ID комнаты.
+    :return: Множество ID участников.
+    """
+
+    now = time.monotonic()
+    cached = _members_cache.get(room_id)
+    if cached is not None and now - cached[1] < settings.ROOM_MEMBERS_CACHE_TTL:
+        _members_cache.move_to_end(room_id)
+        return cached[0]
+
+    members = await RoomDAO.get_member_ids(room_id)
+    _members_cache[room_id] = (members, now)
+    _members_cache.move_to_end(room_id)
+    while len(_members_cache) > settings.ROOM_MEMBERS_CACHE_SIZE:
+        _members_cache.popitem(last=False)
+    return members
+
+
+def invalidate_room_members(room_id: uuid.UUID):
+    """
+    Сбросить кэш участников комнаты после изменения состава.
+
+    :param room_id: ID комнаты.
+    """
+
+    _members_cache.pop(room_id, None)
@@ -0,0 +1,32 @@
+import uuid
+
+from sqlalchemy import String, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from database import Base
+
+
+class Room(Base):
+    """
+    Класс модели группового чата (комнаты).
+    """
+
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    owner_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
+
+
+class RoomMember(Base):
+    """
+    Класс модели участника комнаты.
+    """
+
+    __tablename__ = 'room_members'
+    __table_args__ = (UniqueConstraint('room_id', 'user_id'),)
+
+    room_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('rooms.id', ondelete='CASCADE'), nullable=False
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True
+    )
@@ -0,0 +1,135 @@
+import uuid
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.exc import IntegrityError
+
+from app.attachments.dao import AttachmentDAO
+from app.chat.broadcast import send_to_users
+from app.chat.dao import MessageDAO
+from app.chat.schemas import MessageReadS
+from app.chat.router import message_rate_limit
+from app.rooms.dao import RoomDAO
+from app.rooms.membership import get_room_members, invalidate_room_members
+from app.rooms.schemas import RoomCreateS, RoomReadS, RoomMemberAddS, RoomMessageCreateS
+from app.users.dependencies import get_current_user
+from app.users.models import User
+from exceptions import RoomNotFoundException, RoomMemberNotFoundException
+
+
+router = APIRouter(prefix='/rooms', tags=['Rooms'])
+
+
+async def get_room_member_ids(room_id: uuid.UUID, current_user: User = Depends(get_current_user)) -> frozenset:
+    """
+    Проверяет, что текущий пользователь состоит в комнате.
+
+    :param room_id: ID комнаты.
+    :param current_user: Текущий пользователь.
+    :return: Множество ID участников комнаты.
+    :raises RoomNotFoundException: Если комнаты нет или пользователь в ней не состоит.
+    """
+
+    members = await get_room_members(room_id)
+    if current_user.id not in members:
+        raise RoomNotFoundException
+    return members
+
+
+@router.post('', response_model=RoomReadS)
+async def create_room(room: RoomCreateS, current_user: User = Depends(get_current_user)):
+    """
+    Создать комнату. Создатель автоматически становится участником.
+
+    :param room: Данные комнаты.
+    :param current_user: Текущий пользователь.
+    :return: Созданная комната.
+    :raises RoomMemberNotFoundException: Если кого-то из участников нет среди пользователей.
+    """
+
+    try:
+        return await RoomDAO.create_room(name=room.name, owner_id=current_user.id, member_ids=room.member_ids)
+    except IntegrityError:
+        # Нарушен внешний ключ room_members.user_id: такого пользователя нет
+        raise RoomMemberNotFoundException
+
+
+@router.get('', response_model=List[RoomReadS])
+async def list_rooms(current_user: User = Depends(get_current_user)):
+    """
+    Получить комнаты текущего пользователя.
+    """
+
+    return await RoomDAO.list_user_rooms(user_id=current_user.id)
+
+
+@router.post('/{room_id}/members')
+async def add_room_member(room_id: uuid.UUID, member: RoomMemberAddS,
+                          members: frozenset = Depends(get_room_member_ids)) -> dict:
+    """
+    Добавить участника в комнату. Доступно участникам комнаты.
+
+    :raises RoomMemberNotFoundException: Если такого пользователя нет.
+    """
+
+    try:
+        added = await RoomDAO.add_member(room_id=room_id, user_id=member.user_id)
+    except IntegrityError:
+        raise RoomMemberNotFoundException
+    if added:
+        invalidate_room_members(room_id)
+    return {'message': 'Участник добавлен'}
+
+
+@router.delete('/{room_id}/members/me')
+async def leave_room(room_id: uuid.UUID, current_user: User = Depends(get_current_user)) -> dict:
+    """
+    Покинуть комнату.
+    """
+
+    if not await RoomDAO.remove_member(room_id=room_id, user_id=current_user.id):
+        raise RoomNotFoundException
+    invalidate_room_members(room_id)
+    return {'message': 'Вы покинули комнату'}
+
+
+@router.get('/{room_id}/messages', response_model=List[MessageReadS])
+async def get_room_messages(room_id: uuid.UUID, members: frozenset = Depends(get_room_member_ids)):
+    """
+    Получить сообщения комнаты. Доступно участникам комнаты.
+    """
+
+    return await MessageDAO.get_room_messages(room_id=room_id)
+
+
+@router.post('/{room_id}/messages', dependencies=[Depends(message_rate_limit)])
+async def send_room_message(room_id: uuid.UUID, message: RoomMessageCreateS,
+                            current_user: User = Depends(get_current_user),
+                            members: frozenset = Depends(get_room_member_ids)) -> dict:
+    """
+    Отправить сообщение в комнату.
+
+    Сообщение сохраняется одной записью и рассылается всем подключенным участникам.
+
+    :param room_id: ID комнаты.
+    :param message: Данные сообщения.
+    :param current_user: Текущий пользователь.
+    :param members: Участники комнаты (из кэша).
+    :return: Результат отправки сообщения.
+    """
+
+    await AttachmentDAO.ensure_exists(message.attachment_id)
+    new_message = await MessageDAO.add(
+        sender_id=current_user.id, room_id=room_id, content=message.content, attachment_id=message.attachment_id
+    )
+
+    message_data = {
+        'id': new_message.id,
+        'room_id': room_id,
+        'sender_id': current_user.id,
+        'content': message.content,
+        'attachment_id': message.attachment_id
+    }
+    await send_to_users(members, message_data)
+
+    return {'room_id': room_id, 'status': 'ok', 'message': 'Сообщение сохранено'}
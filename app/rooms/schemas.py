@@ -0,0 +1,40 @@
+import uuid
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class RoomCreateS(BaseModel):
+    """
+    Схема для создания комнаты.
+    """
+
+    name: str = Field(..., min_length=1, max_length=100, description='Название комнаты')
+    member_ids: List[uuid.UUID] = Field(default_factory=list, description='ID участников, кроме создателя')
+
+
+class RoomReadS(BaseModel):
+    """
+    Схема для чтения комнаты.
+    """
+
+    id: uuid.UUID = Field(..., description='Идентификатор комнаты')
+    name: str = Field(..., description='Название комнаты')
+    owner_id: uuid.UUID = Field(..., description='ID создателя комнаты')
+
+
+class RoomMemberAddS(BaseModel):
+    """
+    Схема для добавления участника в комнату.
+    """
+
+    user_id: uuid.UUID = Field(..., description='ID пользователя')
+
+
+class RoomMessageCreateS(BaseModel):
+    """
+    Схема для записи сообщения в комнату.
+    """
+
+    content: str = Field(..., description='Содержимое сообщения')
+    attachment_id: uuid.UUID | None = Field(None, description='ID вложения')
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext  # Настройка и хеширование паролей
 from pydantic import EmailStr
 from jose import jwt
+from starlette.concurrency import run_in_threadpool
 
 from config import get_auth_data
 from app.users.dao import UserDAO
@@ -35,6 +36,8 @@ def get_password_hash(password: str) -> str:
     """
     Хэширует переданный пароль с использованием алгоритма bcrypt.
 
+    Занимает сотни миллисекунд: из асинхронного кода вызывать через run_in_threadpool.
+
     :param password: Строка пароля, которую нужно захэшировать.
     :return: Строка хэша пароля.
     """
@@ -46,6 +49,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Проверяет соответствие введенного пароля и хэша.
 
+    Занимает сотни миллисекунд: из асинхронного кода вызывать через run_in_threadpool.
+
     :param plain_password: Обычный пароль (введенный пользователем).
     :param hashed_password: Захэшированный пароль, сохраненный в базе данных.
     :return: True, если пароли совпадают, иначе False.
@@ -65,6 +70,11 @@ async def authenticate_user(email: EmailStr, password: str):
 
     user = await UserDAO.find_one_or_none(email=email)
 
-    if not user or verify_password(plain_password=password, hashed_password=user.hashed_password) is False:
+    if not user:
+        return None
+    # bcrypt выполняется в пуле потоков, чтобы не блокировать цикл событий
+    password_ok = await run_in_threadpool(verify_password, plain_password=password,
+                                          hashed_password=user.hashed_password)
+    if password_ok is False:
         return None
     return user
@@ -1,6 +1,8 @@
 import uuid
+from datetime import timedelta
+from typing import Iterable
 
-from sqlalchemy import select
+from sqlalchemy import select, update, func
 
 from app.dao.base import BaseDAO
 from app.users.models import User
@@ -32,6 +34,112 @@ class UserDAO(BaseDAO):
                 # await session.refresh(db_user)
                 # return db_user
 
+    @classmethod
+    async def set_online(cls, user_id: uuid.UUID, worker_id: str) -> int:
+        """
+        Отметить пользователя онлайн и закрепить его за воркером.
+
+        :param user_id: ID пользователя.
+        :param worker_id: Идентификатор воркера, который держит соединение.
+        :return: Количество обновленных записей.
+        """
+
+        async with async_session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(cls.model)
+                    .where(cls.model.id == user_id)
+                    .values(online_status=True, online_worker=worker_id, online_seen_at=func.now())
+                )
+                return result.rowcount
+
+    @classmethod
+    async def set_offline(cls, user_ids: Iterable[uuid.UUID], worker_id: str) -> int:
+        """
+        Отметить пользователей оффлайн одним запросом.
+
+        Затрагиваются только записи, принадлежащие воркеру: если пользователь уже
+        переподключился к другому воркеру, его статус не сбрасывается.
+
+        :param user_ids: ID пользователей.
+        :param worker_id: Идентификатор воркера.
+        :return: Количество обновленных записей.
+        """
+
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+
+        async with async_session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(cls.model)
+                    .where(cls.model.id.in_(user_ids), cls.model.online_worker == worker_id)
+                    .values(online_status=False, online_worker=None)
+                )
+                return result.rowcount
+
+    @classmethod
+    async def touch_online(cls, user_ids: Iterable[uuid.UUID], worker_id: str) -> int:
+        """
+        Продлить присутствие пользователей, подключенных к воркеру.
+
+        :param user_ids: ID подключенных пользователей.
+        :param worker_id: Идентификатор воркера.
+        :return: Количество обновленных записей.
+        """
+
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+
+        async with async_session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(cls.model)
+                    .where(cls.model.id.in_(user_ids), cls.model.online_worker == worker_id)
+                    .values(online_seen_at=func.now())
+                )
+                return result.rowcount
+
+    @classmethod
+    async def reset_stale_online(cls, stale_after: float) -> int:
+        """
+        Сбросить статус онлайн, который никто не подтверждал дольше stale_after секунд.
+
+        Так очищаются записи воркеров, завершившихся аварийно.
+
+        :param stale_after: Срок жизни неподтвержденного статуса в секундах.
+        :return: Количество сброшенных записей.
+        """
+
+        async with async_session_maker() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(cls.model)
+                    .where(
+                        cls.model.online_status == True,
+                        (cls.model.online_seen_at == None)
+                        | (cls.model.online_seen_at < func.now() - timedelta(seconds=stale_after))
+                    )
+                    .values(online_status=False, online_worker=None)
+                )
+                return result.rowcount
+
+    @classmethod
+    async def list_statuses(cls):
+        """
+        Получить ID, имя и статус онлайн всех пользователей без загрузки остальных полей.
+
+        :return: Список строк (id, name, online_status).
+        """
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(cls.model.id, cls.model.name, cls.model.online_status).order_by(cls.model.name)
+            )
+            return result.all()
+
     @classmethod
     async def find_all_online_users(cls):
         async with async_session_maker() as session:
@@ -1,11 +1,13 @@
 from datetime import datetime, timezone
 
-from fastapi import Request, HTTPException, status, Depends
+from fastapi import Request, HTTPException, status, Depends, WebSocket
 from jose import jwt, JWTError
 
 from config import get_auth_data
-from exceptions import TokenExpiredException, TokenNoFoundException, NoUserIdException, NoJwtException
+from exceptions import (TokenExpiredException, TokenNoFoundException, NoUserIdException, NoJwtException,
+                        ForbiddenException)
 from app.users.dao import UserDAO
+from app.users.models import User
 
 
 def get_token(request: Request):
@@ -57,3 +59,39 @@ async def get_current_user(token: str = Depends(get_token)):
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Пользователь не найден')
     return user
+
+
+async def get_websocket_user(websocket: WebSocket) -> User | None:
+    """
+    Определяет пользователя WebSocket-подключения по JWT-токену из cookies.
+
+    Вызывается до принятия соединения, поэтому вместо исключений возвращает None.
+
+    :param websocket: Подключение.
+    :return: Объект пользователя или None, если токена нет или он недействителен.
+    """
+
+    token = websocket.cookies.get('user_access_token')
+    if not token:
+        return None
+    try:
+        return await get_current_user(token)
+    except HTTPException:
+        return None
+
+
+async def get_current_admin(current_user: User = Depends(get_current_user)):
+    """
+    Возвращает текущего пользователя, если он администратор (users.is_admin).
+
+    Email для этого не подходит: он не подтверждается, и зарегистрироваться с адресом
+    администратора мог бы кто угодно.
+
+    :param current_user: Текущий пользователь.
+    :return: Объект пользователя.
+    :raises ForbiddenException: Если пользователь не администратор.
+    """
+
+    if not current_user.is_admin:
+        raise ForbiddenException
+    return current_user
@@ -1,4 +1,6 @@
-from sqlalchemy import String, Integer, Boolean
+from datetime import datetime
+
+from sqlalchemy import String, Integer, Boolean, false
 from sqlalchemy.orm import Mapped, mapped_column
 
 from database import Base
@@ -13,3 +15,8 @@ class User(Base):
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     email: Mapped[str] = mapped_column(String, nullable=False)
     online_status: Mapped[bool] = mapped_column(Boolean, default=False, nullable=True)
+    # Воркер, который держит WebSocket пользователя, и время последнего подтверждения присутствия
+    online_worker: Mapped[str | None] = mapped_column(String, nullable=True)
+    online_seen_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    # Администратор (может делать рассылку всем пользователям); выдается вне приложения, см. миграцию e5d1a9c7b3f2
+    is_admin: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
@@ -5,19 +5,28 @@ from fastapi import APIRouter, Response, Depends
 from fastapi.requests import Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
+from app.assets.manifest import register_asset_helpers
 from app.chat.router import active_connections
+from app.ratelimit.dependencies import rate_limit_by_ip
+from config import settings
 from app.users.dependencies import get_current_user
 from app.users.models import User
 from exceptions import UserAlreadyExistsException, IncorrectEmailOrPasswordException, PasswordMismatchException
 from app.users.auth import get_password_hash, authenticate_user, create_access_token
 from app.users.dao import UserDAO
-from app.users.schemas import SUserRegister, SUserAuth, SUserRead
+from app.users.schemas import SUserRegister, SUserAuth, SUserRead, SUserStatus
+from app.users.status_cache import get_users_status_snapshot, invalidate_users_status
 
 
 router = APIRouter(prefix='/auth', tags=['Auth'])
 templates = Jinja2Templates(directory='templates')
+register_asset_helpers(templates)
+
+# Регистрация и вход упираются в bcrypt, поэтому ограничиваются по IP-адресу
+auth_rate_limit = rate_limit_by_ip('auth', rate=settings.RATE_LIMIT_AUTH_RATE, burst=settings.RATE_LIMIT_AUTH_BURST)
 
 
 @router.get("/", response_class=HTMLResponse, summary="Страница авторизации")
@@ -29,7 +38,7 @@ async def get_auth_page(request: Request):
     return templates.TemplateResponse("auth.html", {"request": request})
 
 
-@router.post('/register')
+@router.post('/register', dependencies=[Depends(auth_rate_limit)])
 async def register_user(user_data: SUserRegister) -> dict:
     """
     Регистрация нового пользователя.
@@ -51,17 +60,18 @@ async def register_user(user_data: SUserRegister) -> dict:
     if user_data.password != user_data.password_check:
         raise PasswordMismatchException
 
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     await UserDAO.add(
         name=user_data.name,
         email=user_data.email,
         hashed_password=hashed_password
     )
+    invalidate_users_status()
 
     return {'message': 'Вы успешно зарегистрированы'}
 
 
-@router.post('/login/')
+@router.post('/login/', dependencies=[Depends(auth_rate_limit)])
 async def auth_user(response: Response, user_data: SUserAuth) -> dict:
     """
     Авторизация пользователя.
@@ -132,10 +142,17 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
 
-@router.get("/users/status", response_model=List[SUserRead])
-async def get_users_status():
+@router.get("/users/status", response_model=List[SUserStatus])
+async def get_users_status(request: Request):
     """
     Возвращает всех пользователей с их статусом онлайн/оффлайн.
+
+    Ответ строится из общего снимка (см. app.users.status_cache). Если снимок не изменился
+    с прошлого запроса клиента (If-None-Match), возвращается 304 без тела.
     """
-    users = await UserDAO.find_all()
-    return [{"id": user.id, "name": user.name, "online_status": user.online_status} for user in users]
+
+    body, etag = await get_users_status_snapshot()
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag in request.headers.get('if-none-match', ''):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
@@ -32,3 +32,13 @@ class SUserRead(BaseModel):
     name: str = Field(..., min_length=3, max_length=50, description='Имя, от 3 до 50 символов')
     email: EmailStr = Field(..., description='Электронная почта')
     online_status: bool = Field(..., description='Статус пользователя')
+
+
+class SUserStatus(BaseModel):
+    """
+    Схема для публичного списка статусов пользователей.
+    """
+
+    id: uuid.UUID = Field(..., description='Идентификатор пользователя')
+    name: str = Field(..., description='Имя')
+    online_status: bool = Field(..., description='Статус пользователя')
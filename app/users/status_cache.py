@@ -0,0 +1,72 @@
+import asyncio
+import hashlib
+import time
+from typing import List, Tuple
+
+from pydantic import TypeAdapter
+
+from app.users.dao import UserDAO
+from app.users.schemas import SUserStatus
+from config import settings
+
+
+_statuses_adapter = TypeAdapter(List[SUserStatus])
+
+# Версия списка статусов: увеличивается при регистрации и изменении присутствия
+_version = 0
+# Снимок: (версия, время построения по time.monotonic(), тело ответа, ETag)
+_snapshot: Tuple[int, float, bytes, str] | None = None
+# Построение снимка, которое сейчас выполняется (одно на воркер)
+_building: asyncio.Future | None = None
+
+
+def invalidate_users_status():
+    """
+    Отметить снимок статусов устаревшим. Новый снимок строится при следующем запросе.
+    """
+
+    global _version
+    _version += 1
+
+
+async def _build_snapshot(version: int) -> Tuple[int, float, bytes, str]:
+    users = await UserDAO.list_statuses()
+    body = _statuses_adapter.dump_json(
+        [SUserStatus(id=user.id, name=user.name, online_status=bool(user.online_status)) for user in users]
+    )
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    return version, time.monotonic(), body, etag
+
+
+async def get_users_status_snapshot() -> Tuple[bytes, str]:
+    """
+    Получить сериализованный список статусов пользователей.
+
+    Снимок живет до изменения версии, но не дольше USERS_STATUS_CACHE_TTL (изменения,
+    сделанные другими воркерами, видны не позже этого срока). Если снимок устарел,
+    его строит только первый запрос, остальные дожидаются результата.
+
+    :return: Тело ответа в JSON и его ETag.
+    """
+
+    global _building
+
+    snapshot = _snapshot
+    if (snapshot is not None and snapshot[0] == _version
+            and time.monotonic() - snapshot[1] < settings.USERS_STATUS_CACHE_TTL):
+        return snapshot[2], snapshot[3]
+
+    if _building is None:
+        _building = asyncio.ensure_future(_build_snapshot(_version))
+        _building.add_done_callback(_build_finished)
+    # shield: отмена одного запроса не прерывает построение для остальных
+    snapshot = await asyncio.shield(_building)
+    return snapshot[2], snapshot[3]
+
+
+def _build_finished(future: asyncio.Future):
+    global _snapshot, _building
+
+    _building = None
+    if not future.cancelled() and future.exception() is None:
+        _snapshot = future.result()
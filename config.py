@@ -1,4 +1,6 @@
 import os
+from typing import List
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,6 +17,114 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
 
+    # Пул соединений с бд: он же заполняется при прогреве
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    # Сколько секунд при остановке ждать завершения отправок в WebSocket
+    SHUTDOWN_DRAIN_TIMEOUT: float = 10
+
+    # WebSocket: интервал пинга и таймаут простоя соединения (секунды)
+    WS_PING_INTERVAL: float = 20
+    WS_IDLE_TIMEOUT: float = 60
+    # WebSocket: ожидание ответа на пинг протокола (секунды), максимальный размер кадра (байты)
+    # и очередь входящих кадров на соединение
+    WS_PING_TIMEOUT: float = 20
+    WS_MAX_SIZE: int = 1024 * 1024
+    WS_MAX_QUEUE: int = 32
+    # Сжатие кадров WebSocket (permessage-deflate)
+    WS_PER_MESSAGE_DEFLATE: bool = True
+    # Присутствие: период сверки статусов и срок, после которого статус онлайн считается устаревшим
+    PRESENCE_RECONCILE_INTERVAL: float = 30
+    PRESENCE_STALE_AFTER: float = 90
+
+    # Контроль цикла событий: период измерения задержки, длительность блокировки, после которой
+    # в лог пишется стек (секунды), и вес нового замера в скользящем среднем задержки
+    LOOP_LAG_INTERVAL: float = 0.1
+    LOOP_BLOCK_THRESHOLD: float = 0.2
+    LOOP_LAG_SMOOTHING: float = 0.2
+    # Отклонение новых запросов (503): при средней задержке цикла больше ADMISSION_MAX_LAG секунд
+    # или при ADMISSION_MAX_INFLIGHT одновременных HTTP-запросов (0 — без ограничения).
+    # ADMISSION_MAX_LAG больше LOOP_BLOCK_THRESHOLD: о разовой блокировке сообщает стек в логе,
+    # а запросы отклоняются только при устойчивой задержке
+    ADMISSION_MAX_LAG: float = 0.3
+    ADMISSION_MAX_INFLIGHT: int = 1000
+
+    # Ограничение частоты запросов (token bucket): скорость пополнения в секунду и емкость корзины
+    RATE_LIMIT_MESSAGES_RATE: float = 5
+    RATE_LIMIT_MESSAGES_BURST: int = 20
+    RATE_LIMIT_AUTH_RATE: float = 0.2
+    RATE_LIMIT_AUTH_BURST: int = 5
+    # Как часто удалять простаивающие корзины (секунды)
+    RATE_LIMIT_SWEEP_INTERVAL: float = 60
+
+    # Индикатор набора: не чаще одного события на переписку за указанный интервал (секунды)
+    TYPING_THROTTLE_INTERVAL: float = 2
+    # Период записи накопленных отметок о прочтении в бд (секунды)
+    READ_MARKS_FLUSH_INTERVAL: float = 5
+    # Максимум отметок в одном запросе записи (по 4 параметра на отметку, лимит PostgreSQL — 32767)
+    READ_MARKS_UPSERT_BATCH: int = 1000
+
+    # Production-сервер (server.py): адрес, число воркеров (0 — по числу ядер),
+    # очередь входящих подключений, keep-alive (секунды), адреса прокси для X-Forwarded-For
+    SERVER_HOST: str = '0.0.0.0'
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE: int = 5
+    SERVER_FORWARDED_ALLOW_IPS: str = '127.0.0.1'
+    SERVER_ACCESS_LOG: bool = False
+
+    # Хранение сообщений: срок в днях (0 — хранить бессрочно), размер пачки удаления,
+    # пауза между пачками и период запуска очистки внутри приложения (секунды)
+    MESSAGE_RETENTION_DAYS: int = 0
+    PURGE_BATCH_SIZE: int = 1000
+    PURGE_BATCH_PAUSE: float = 0.2
+    PURGE_INTERVAL: float = 3600
+
+    # Массовая загрузка: записей в одной пачке COPY
+    IMPORT_CHUNK_SIZE: int = 10000
+
+    # Рассылка: одновременных отправок и таймаут отправки в одно соединение (секунды)
+    BROADCAST_CONCURRENCY: int = 500
+    BROADCAST_SEND_TIMEOUT: float = 5
+
+    # Фоновая обработка сообщений: число обработчиков и размер очереди
+    ENRICH_WORKERS: int = 4
+    ENRICH_QUEUE_SIZE: int = 1000
+    # Превью ссылок: ссылок на сообщение, таймаут (секунды) и объем загрузки (байты), число редиректов.
+    # Обращения к локальным и частным адресам запрещены, если не включен ENRICH_ALLOW_PRIVATE_HOSTS
+    ENRICH_MAX_LINKS: int = 3
+    ENRICH_FETCH_TIMEOUT: float = 3
+    ENRICH_MAX_FETCH_BYTES: int = 256 * 1024
+    ENRICH_MAX_REDIRECTS: int = 3
+    ENRICH_ALLOW_PRIVATE_HOSTS: bool = False
+    # Кэш результатов обработки: максимальное число записей и срок жизни (секунды)
+    ENRICH_CACHE_SIZE: int = 10000
+    ENRICH_CACHE_TTL: float = 3600
+    # Слова, скрываемые фильтром (JSON-список в .env)
+    CONTENT_FILTER_WORDS: List[str] = []
+
+    # Кэш участников комнат: срок жизни записи (секунды) и максимальное число комнат.
+    # Кэш сбрасывается только в воркере, который изменил состав комнаты: остальные воркеры
+    # видят изменение (например, не рассылают сообщения удаленному участнику) не позже чем через TTL
+    ROOM_MEMBERS_CACHE_TTL: float = 3
+    ROOM_MEMBERS_CACHE_SIZE: int = 10000
+
+    # Кэш публичного списка статусов пользователей: срок жизни снимка (секунды)
+    USERS_STATUS_CACHE_TTL: float = 5
+
+    # Вложения: каталог хранилища, максимальный размер файла и размер блока чтения/записи (байты)
+    ATTACHMENTS_DIR: str = 'media/attachments'
+    ATTACHMENTS_MAX_SIZE: int = 50 * 1024 * 1024
+    ATTACHMENTS_CHUNK_SIZE: int = 64 * 1024
+    # Незавершенная загрузка, в которую столько секунд ничего не дописывалось, удаляется;
+    # проверка выполняется раз в ATTACHMENTS_CLEANUP_INTERVAL секунд
+    ATTACHMENTS_UPLOAD_TTL: float = 24 * 3600
+    ATTACHMENTS_CLEANUP_INTERVAL: float = 3600
+
+    # Минимальный размер ответа (байты), начиная с которого он сжимается gzip
+    GZIP_MINIMUM_SIZE: int = 1024
+
     # Передаём путь к нашему .env-файлу
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
@@ -1,3 +1,6 @@
+import os
+import threading
+import time
 import uuid
 from datetime import datetime
 
@@ -6,13 +9,38 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
 
-from config import get_db_url
+from config import get_db_url, settings
 
 
 DATABASE_URL = get_db_url()
-engine = create_async_engine(DATABASE_URL)
+engine = create_async_engine(DATABASE_URL, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+_uuid7_lock = threading.Lock()
+_last_uuid7 = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Сгенерировать UUID версии 7 (RFC 9562): 48 бит времени в миллисекундах и 74 случайных бита.
+
+    Такие идентификаторы упорядочены по времени создания, поэтому новые записи добавляются
+    в конец индекса первичного ключа, а сортировка по id совпадает с хронологической.
+    В пределах процесса значения строго возрастают, даже если созданы в одну миллисекунду.
+
+    :return: Новый идентификатор.
+    """
+
+    global _last_uuid7
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | (0x7 << 76)  # версия
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # вариант RFC 9562
+    with _uuid7_lock:
+        if value <= _last_uuid7:
+            value = _last_uuid7 + 1
+        _last_uuid7 = value
+    return uuid.UUID(int=value)
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     """
@@ -26,7 +54,7 @@ class Base(AsyncAttrs, DeclarativeBase):
         return f'{cls.__name__.lower()}s'
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4(), unique=True, nullable=False
+        UUID(as_uuid=True), primary_key=True, default=uuid7, unique=True, nullable=False
     )
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
@@ -12,6 +12,12 @@ class TokenNoFoundException(HTTPException):
         super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail='Токен не найден')
 
 
+class TooManyRequestsException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail='Слишком много запросов',
+                         headers={'Retry-After': str(retry_after)})
+
+
 UserAlreadyExistsException = HTTPException(status_code=status.HTTP_409_CONFLICT,
                                            detail='Пользователь уже существует')
 
@@ -27,3 +33,20 @@ NoUserIdException = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                   detail='Не найден ID пользователя')
 
 ForbiddenException = HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Недостаточно прав!')
+
+RoomNotFoundException = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Комната не найдена')
+
+RoomMemberNotFoundException = HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                            detail='Пользователь для добавления в комнату не найден')
+
+AttachmentNotFoundException = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Вложение не найдено')
+
+UploadNotFoundException = HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Загрузка не найдена')
+
+UploadOffsetMismatchException = HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                              detail='Смещение не совпадает с принятым объемом данных')
+
+UploadIncompleteException = HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Файл загружен не полностью')
+
+UploadTooLargeException = HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                        detail='Размер данных превышает заявленный')
@@ -1,17 +1,62 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI, Request, APIRouter
 from fastapi.responses import RedirectResponse
 from fastapi.exceptions import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from exceptions import TokenExpiredException, TokenNoFoundException
 from app.users.router import router as user_router
 from app.chat.router import router as chat_router
+from app.rooms.router import router as rooms_router
+from app.attachments.router import router as attachments_router
+from app.attachments.storage import upload_cleanup_loop
+from app.chat.connections import start_presence_tasks
+from app.chat.events import read_marks_flush_loop
+from app.chat.retention import retention_loop
+from app.enrichment.pipeline import run_enrichment_workers
+from app.health.admission import AdmissionControlMiddleware
+from app.health.lifecycle import warmup, drain
+from app.health.loopmonitor import start_loop_monitor
+from app.health.router import router as health_router
+from app.assets.compression import SelectiveGZipMiddleware
+from app.assets.staticfiles import PrecompressedStaticFiles
+from config import settings
+from database import engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запуск и остановка приложения.
+
+    При старте прогревает пул соединений (до его окончания /health/ready отвечает 503)
+    и запускает фоновые задачи. При остановке закрывает WebSocket-соединения,
+    сбрасывает статусы присутствия и освобождает пул.
+    """
+
+    tasks = [
+        start_loop_monitor(),
+        asyncio.create_task(warmup(), name='warmup'),
+        asyncio.create_task(read_marks_flush_loop(), name='read-marks-flush'),
+        asyncio.create_task(run_enrichment_workers(), name='enrichment'),
+        asyncio.create_task(upload_cleanup_loop(), name='uploads-cleanup'),
+        *start_presence_tasks(),
+    ]
+    if settings.MESSAGE_RETENTION_DAYS > 0:
+        tasks.append(asyncio.create_task(retention_loop(), name='messages-retention'))
+    yield
+    await drain()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await engine.dispose()
 
 
-app = FastAPI()
-app.mount('/static', StaticFiles(directory='static'), name='static')
+app = FastAPI(lifespan=lifespan)
+app.mount('/static', PrecompressedStaticFiles(directory='static'), name='static')
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,9 +65,18 @@ app.add_middleware(
     allow_methods=["*"],  # Разрешить все методы (GET, POST, PUT, DELETE и т.д.)
     allow_headers=["*"],  # Разрешить все заголовки
 )
+# Сжатие крупных ответов (списки пользователей и сообщений); вложения отдаются как есть
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE,
+                   exclude_paths=('/attachments/',))
+# Добавляется последним, чтобы быть внешним: перегруженный воркер отказывает до любой другой работы
+app.add_middleware(AdmissionControlMiddleware, max_lag=settings.ADMISSION_MAX_LAG,
+                   max_inflight=settings.ADMISSION_MAX_INFLIGHT, exempt_paths=('/health',))
 
+app.include_router(health_router)
 app.include_router(user_router)
 app.include_router(chat_router)
+app.include_router(rooms_router)
+app.include_router(attachments_router)
 
 
 @app.get("/")
@@ -47,4 +101,5 @@ async def token_no_found_exception_handler(request: Request, exc: HTTPException)
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host='127.0.0.1', port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host='127.0.0.1', port=8000, reload=True,
+                ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE)
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Запуск приложения в production-режиме.
+
+    python server.py
+
+Запускает SERVER_WORKERS процессов (0 — по числу доступных ядер) на одном общем сокете.
+Если установлены uvloop и httptools, используются они, иначе стандартный asyncio и h11.
+Лимиты WebSocket, keep-alive и backlog берутся из Settings. Каждый воркер перед стартом
+приложения выполняет хуки из worker_startup_hooks и при остановке плавно закрывает
+WebSocket-соединения (см. app.health.lifecycle.DrainingServer).
+
+Для разработки по-прежнему используется python main.py (один процесс с перезагрузкой).
+"""
+import gc
+import importlib.util
+import inspect
+import logging
+import os
+from typing import Callable, List
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.health.lifecycle import DrainingServer
+from config import settings
+
+
+logger = logging.getLogger('uvicorn.error')
+
+# Хуки запуска воркера: вызываются в каждом процессе после импорта приложения
+# и до его lifespan. Принимают uvicorn.Config, могут быть асинхронными.
+worker_startup_hooks: List[Callable] = []
+
+
+def on_worker_startup(hook: Callable) -> Callable:
+    """Декоратор: зарегистрировать хук запуска воркера."""
+
+    worker_startup_hooks.append(hook)
+    return hook
+
+
+@on_worker_startup
+def freeze_imported_objects(config: uvicorn.Config):
+    # Объекты, созданные при импорте, живут до конца процесса: убираем их из-под сборщика мусора,
+    # чтобы полные сборки не обходили их заново
+    gc.collect()
+    gc.freeze()
+
+
+@on_worker_startup
+def log_worker_started(config: uvicorn.Config):
+    logger.info('Воркер %d: loop=%s, http=%s', os.getpid(), config.loop, config.http)
+
+
+class WorkerServer(DrainingServer):
+    """
+    Сервер воркера: выполняет хуки запуска перед стартом приложения.
+    """
+
+    async def startup(self, sockets=None):
+        for hook in worker_startup_hooks:
+            result = hook(self.config)
+            if inspect.isawaitable(result):
+                await result
+        await super().startup(sockets=sockets)
+
+
+def available_cpus() -> int:
+    """Число ядер, доступных процессу (с учетом ограничений cpuset в контейнере)."""
+
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def build_config() -> uvicorn.Config:
+    """Собрать конфигурацию uvicorn из Settings."""
+
+    return uvicorn.Config(
+        'main:app',
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS or available_cpus(),
+        loop='uvloop' if has_module('uvloop') else 'asyncio',
+        http='httptools' if has_module('httptools') else 'h11',
+        ws='websockets',
+        ws_max_size=settings.WS_MAX_SIZE,
+        ws_max_queue=settings.WS_MAX_QUEUE,
+        ws_ping_interval=settings.WS_PING_INTERVAL,
+        ws_ping_timeout=settings.WS_PING_TIMEOUT,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        timeout_graceful_shutdown=settings.SHUTDOWN_DRAIN_TIMEOUT,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        lifespan='on',
+    )
+
+
+def main():
+    config = build_config()
+    server = WorkerServer(config=config)
+
+    logger.info('Запуск %d воркеров на %s:%d', config.workers, config.host, config.port)
+    if config.workers > 1:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,12 @@
 let selectedUserId = null;
 let socket = null;
 let messagePollingInterval = null;
+// Индикатор набора и отметки о прочтении
+const TYPING_SEND_INTERVAL = 2000;
+const TYPING_SHOW_DURATION = 3000;
+let lastTypingSent = 0;
+let typingHideTimeout = null;
+let lastReadSent = null;
 
 // Функция выхода из аккаунта
 async function logout() {
@@ -24,7 +30,8 @@ async function logout() {
 // Функция выбора пользователя
 async function selectUser(userId, userName, event) {
     selectedUserId = userId;
-    document.getElementById('chatHeader').innerHTML = `<span>Чат с ${userName}</span><button class="logout-button" id="logoutButton">Выход</button>`;
+    lastReadSent = null;
+    document.getElementById('chatHeader').innerHTML = `<span>Чат с ${userName} <small class="chat-status" id="chatStatus"></small></span><button class="logout-button" id="logoutButton">Выход</button>`;
     document.getElementById('messageInput').disabled = false;
     document.getElementById('sendButton').disabled = false;
 
@@ -55,21 +62,80 @@ async function loadMessages(userId) {
 
         // Прокрутка к последнему сообщению
         scrollToBottom(messagesContainer);
+
+        if (messages.length) sendReadMark(messages[messages.length - 1].id);
     } catch (error) {
         console.error('Ошибка загрузки сообщений:', error);
     }
 }
 
 // Подключение WebSocket
+// Предпочитаем компактный бинарный формат MessagePack, JSON остается запасным вариантом
+const WS_SUBPROTOCOLS = ['chat.msgpack.v1', 'chat.json.v1'];
+
+// Разбор входящего кадра: бинарные кадры — MessagePack, текстовые — JSON
+function decodeFrame(data) {
+    return typeof data === 'string' ? JSON.parse(data) : MsgPack.decode(data);
+}
+
+// Отправка данных в формате, согласованном с сервером
+function sendFrame(payload) {
+    if (!socket || socket.readyState !== WebSocket.OPEN) return;
+    socket.send(socket.protocol === 'chat.msgpack.v1' ? MsgPack.encode(payload) : JSON.stringify(payload));
+}
+
+// Отметка о прочтении переписки до сообщения messageId (отправляется, только если она новая)
+function sendReadMark(messageId) {
+    if (messageId === lastReadSent) return;
+    if (!socket || socket.readyState !== WebSocket.OPEN) return;
+    lastReadSent = messageId;
+    sendFrame({type: 'read', peer_id: selectedUserId, message_id: messageId});
+}
+
+// Событие набора: сервер пересылает его собеседнику, отправляем не чаще раза в TYPING_SEND_INTERVAL
+function sendTyping() {
+    const now = Date.now();
+    if (!selectedUserId || now - lastTypingSent < TYPING_SEND_INTERVAL) return;
+    lastTypingSent = now;
+    sendFrame({type: 'typing', to: selectedUserId});
+}
+
+// Строка состояния собеседника в заголовке чата
+function showChatStatus(text, duration) {
+    const status = document.getElementById('chatStatus');
+    if (!status) return;
+    status.textContent = text;
+    clearTimeout(typingHideTimeout);
+    if (duration) typingHideTimeout = setTimeout(() => { status.textContent = ''; }, duration);
+}
+
 function connectWebSocket() {
     if (socket) socket.close();
 
-    socket = new WebSocket(`ws://${window.location.host}/chat/ws/${selectedUserId}`);
+    // Соединение открывается от имени текущего пользователя (сервер сверяет id с cookie авторизации)
+    socket = new WebSocket(`ws://${window.location.host}/chat/ws/${currentUserId}`, WS_SUBPROTOCOLS);
+    socket.binaryType = 'arraybuffer';
 
-    socket.onopen = () => console.log('WebSocket соединение установлено');
+    socket.onopen = () => console.log(`WebSocket соединение установлено (${socket.protocol || 'json'})`);
 
     socket.onmessage = (event) => {
-        const incomingMessage = JSON.parse(event.data);
+        const incomingMessage = decodeFrame(event.data);
+        // Отвечаем на heartbeat сервера, иначе соединение будет закрыто как неактивное
+        if (incomingMessage.type === 'ping') {
+            sendFrame({type: 'pong'});
+            return;
+        }
+        // Собеседник набирает сообщение или прочитал переписку
+        if (incomingMessage.type === 'typing') {
+            if (incomingMessage.user_id === selectedUserId && !incomingMessage.room_id) {
+                showChatStatus('печатает…', TYPING_SHOW_DURATION);
+            }
+            return;
+        }
+        if (incomingMessage.type === 'read') {
+            if (incomingMessage.user_id === selectedUserId) showChatStatus('прочитано');
+            return;
+        }
         if (incomingMessage.recipient_id === selectedUserId) {
             addMessage(incomingMessage.content, incomingMessage.recipient_id);
 
@@ -79,7 +145,16 @@ function connectWebSocket() {
         }
     };
 
-    socket.onclose = () => console.log('WebSocket соединение закрыто');
+    socket.onclose = (event) => {
+        console.log('WebSocket соединение закрыто');
+        // Сервер перезапускается (1001, 1012), временно не принимает подключения (1013)
+        // или отклонил рукопожатие при перегрузке (1006): переподключаемся, если пользователь не сменил чат
+        if ([1001, 1006, 1012, 1013].includes(event.code) && event.target === socket) {
+            setTimeout(() => {
+                if (event.target === socket) connectWebSocket();
+            }, 1000 + Math.random() * 2000);
+        }
+    };
 }
 
 // Отправка сообщения
@@ -97,10 +172,7 @@ async function sendMessage() {
                 body: JSON.stringify(payload)
             });
 
-            // WebSocket отправляет сообщение, сервер обработает и вернет его клиенту
-            socket.send(JSON.stringify(payload));
-
-            // Убираем локальное добавление, так как WebSocket обработает это
+            // Сообщение вернется по WebSocket от сервера, локально оно не добавляется
             messageInput.value = '';
         } catch (error) {
             console.error('Ошибка при отправке сообщения:', error);
@@ -179,6 +251,7 @@ setInterval(fetchUsers, 10000); // Обновление каждые 10 секу
 
 // Обработчики для кнопки отправки и ввода сообщения
 document.getElementById('sendButton').onclick = sendMessage;
+document.getElementById('messageInput').oninput = sendTyping;
 document.getElementById('messageInput').onkeypress = async (e) => {
     if (e.key === 'Enter') {
         await sendMessage();
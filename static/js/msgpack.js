@@ -0,0 +1,167 @@
+// Минимальный кодек MessagePack для кадров WebSocket чата (подпротокол chat.msgpack.v1).
+// Сервер передает UUID расширением с типом UUID_EXT_TYPE (16 байт) — декодер превращает их в строки
+// вида xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx, чтобы они совпадали с идентификаторами из JSON API.
+// Обычные bin-значения возвращаются как Uint8Array, прочие расширения — как {type, data}.
+
+const MsgPack = (() => {
+    const textDecoder = new TextDecoder();
+    const textEncoder = new TextEncoder();
+    // Должен совпадать с UUID_EXT_TYPE в app/chat/codec.py
+    const UUID_EXT_TYPE = 1;
+
+    // Преобразование 16 байт в строковый UUID
+    function bytesToUuid(bytes) {
+        const hex = Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+        return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+    }
+
+    function decode(buffer) {
+        const bytes = new Uint8Array(buffer);
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        let offset = 0;
+
+        const readStr = length => {
+            const value = textDecoder.decode(bytes.subarray(offset, offset + length));
+            offset += length;
+            return value;
+        };
+        const readBin = length => {
+            const value = bytes.slice(offset, offset + length);
+            offset += length;
+            return value;
+        };
+        const readExt = length => {
+            const type = view.getInt8(offset++);
+            const data = bytes.slice(offset, offset + length);
+            offset += length;
+            return type === UUID_EXT_TYPE && length === 16 ? bytesToUuid(data) : {type, data};
+        };
+        const readArray = length => {
+            const value = new Array(length);
+            for (let i = 0; i < length; i++) value[i] = read();
+            return value;
+        };
+        const readMap = length => {
+            const value = {};
+            for (let i = 0; i < length; i++) {
+                const key = read();
+                value[key] = read();
+            }
+            return value;
+        };
+        const take = (size, getter) => {
+            const value = getter(offset);
+            offset += size;
+            return value;
+        };
+
+        function read() {
+            const type = bytes[offset++];
+
+            if (type <= 0x7f) return type;
+            if (type >= 0xe0) return type - 0x100;
+            if ((type & 0xf0) === 0x80) return readMap(type & 0x0f);
+            if ((type & 0xf0) === 0x90) return readArray(type & 0x0f);
+            if ((type & 0xe0) === 0xa0) return readStr(type & 0x1f);
+
+            switch (type) {
+                case 0xc0: return null;
+                case 0xc2: return false;
+                case 0xc3: return true;
+                case 0xc4: return readBin(take(1, o => view.getUint8(o)));
+                case 0xc5: return readBin(take(2, o => view.getUint16(o)));
+                case 0xc6: return readBin(take(4, o => view.getUint32(o)));
+                case 0xc7: return readExt(take(1, o => view.getUint8(o)));
+                case 0xc8: return readExt(take(2, o => view.getUint16(o)));
+                case 0xc9: return readExt(take(4, o => view.getUint32(o)));
+                case 0xca: return take(4, o => view.getFloat32(o));
+                case 0xcb: return take(8, o => view.getFloat64(o));
+                case 0xcc: return take(1, o => view.getUint8(o));
+                case 0xcd: return take(2, o => view.getUint16(o));
+                case 0xce: return take(4, o => view.getUint32(o));
+                case 0xcf: return Number(take(8, o => view.getBigUint64(o)));
+                case 0xd0: return take(1, o => view.getInt8(o));
+                case 0xd1: return take(2, o => view.getInt16(o));
+                case 0xd2: return take(4, o => view.getInt32(o));
+                case 0xd3: return Number(take(8, o => view.getBigInt64(o)));
+                case 0xd4: return readExt(1);
+                case 0xd5: return readExt(2);
+                case 0xd6: return readExt(4);
+                case 0xd7: return readExt(8);
+                case 0xd8: return readExt(16);
+                case 0xd9: return readStr(take(1, o => view.getUint8(o)));
+                case 0xda: return readStr(take(2, o => view.getUint16(o)));
+                case 0xdb: return readStr(take(4, o => view.getUint32(o)));
+                case 0xdc: return readArray(take(2, o => view.getUint16(o)));
+                case 0xdd: return readArray(take(4, o => view.getUint32(o)));
+                case 0xde: return readMap(take(2, o => view.getUint16(o)));
+                case 0xdf: return readMap(take(4, o => view.getUint32(o)));
+                default: throw new Error(`MessagePack: неподдерживаемый тип 0x${type.toString(16)}`);
+            }
+        }
+
+        return read();
+    }
+
+    function encode(value) {
+        const parts = [];
+        const pushHeader = (...header) => parts.push(Uint8Array.from(header));
+        const pushView = (size, setter) => {
+            const chunk = new Uint8Array(size);
+            setter(new DataView(chunk.buffer));
+            parts.push(chunk);
+        };
+
+        function write(item) {
+            if (item === null || item === undefined) return pushHeader(0xc0);
+            if (item === false) return pushHeader(0xc2);
+            if (item === true) return pushHeader(0xc3);
+
+            if (typeof item === 'number') {
+                if (Number.isInteger(item) && item >= 0 && item <= 0x7f) return pushHeader(item);
+                if (Number.isInteger(item) && item < 0 && item >= -32) return pushHeader(0x100 + item);
+                if (Number.isInteger(item) && Math.abs(item) <= 0x7fffffff) {
+                    return pushView(5, v => { v.setUint8(0, 0xd2); v.setInt32(1, item); });
+                }
+                return pushView(9, v => { v.setUint8(0, 0xcb); v.setFloat64(1, item); });
+            }
+
+            if (typeof item === 'string') {
+                const encoded = textEncoder.encode(item);
+                if (encoded.length < 32) pushHeader(0xa0 | encoded.length);
+                else if (encoded.length <= 0xff) pushHeader(0xd9, encoded.length);
+                else if (encoded.length <= 0xffff) pushView(3, v => { v.setUint8(0, 0xda); v.setUint16(1, encoded.length); });
+                else pushView(5, v => { v.setUint8(0, 0xdb); v.setUint32(1, encoded.length); });
+                return parts.push(encoded);
+            }
+
+            if (item instanceof Uint8Array) {
+                if (item.length <= 0xff) pushHeader(0xc4, item.length);
+                else if (item.length <= 0xffff) pushView(3, v => { v.setUint8(0, 0xc5); v.setUint16(1, item.length); });
+                else pushView(5, v => { v.setUint8(0, 0xc6); v.setUint32(1, item.length); });
+                return parts.push(item);
+            }
+
+            if (Array.isArray(item)) {
+                if (item.length < 16) pushHeader(0x90 | item.length);
+                else pushView(5, v => { v.setUint8(0, 0xdd); v.setUint32(1, item.length); });
+                return item.forEach(write);
+            }
+
+            const entries = Object.entries(item);
+            if (entries.length < 16) pushHeader(0x80 | entries.length);
+            else pushView(5, v => { v.setUint8(0, 0xdf); v.setUint32(1, entries.length); });
+            entries.forEach(([key, val]) => { write(key); write(val); });
+        }
+
+        write(value);
+
+        const size = parts.reduce((total, part) => total + part.length, 0);
+        const result = new Uint8Array(size);
+        let offset = 0;
+        parts.forEach(part => { result.set(part, offset); offset += part.length; });
+        return result;
+    }
+
+    return {decode, encode};
+})();
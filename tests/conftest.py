@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Настройки без значений по умолчанию: тестам бд не нужна, но Settings без них не создается
+for name, value in {'DB_HOST': 'localhost', 'DB_PORT': '5432', 'DB_NAME': 'test', 'DB_USER': 'test',
+                    'DB_PASSWORD': 'test', 'SECRET_KEY': 'test', 'ALGORITHM': 'HS256'}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ipaddress
+
+import httpx
+import pytest
+
+from app.enrichment import previews
+from app.enrichment.previews import fetch_preview
+from config import settings
+
+
+PAGE = (b'<html><head><title>Stub page</title>'
+        b'<meta property="og:description" content="Local stub"></head><body></body></html>')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hosts.append(self.headers['Host'])
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.hosts = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(url: str) -> dict | None:
+    async def run():
+        async with httpx.AsyncClient(timeout=5, follow_redirects=False, trust_env=False) as client:
+            return await fetch_preview(client, url)
+
+    return asyncio.run(run())
+
+
+def test_preview_from_local_stub_when_private_hosts_allowed(stub_server, monkeypatch):
+    monkeypatch.setattr(settings, 'ENRICH_ALLOW_PRIVATE_HOSTS', True)
+    url = f'http://localhost:{stub_server.server_port}/page'
+
+    preview = fetch(url)
+
+    assert preview == {'url': url, 'title': 'Stub page', 'description': 'Local stub', 'image': None}
+    # Соединение идет на проверенный адрес, но заголовок Host остается исходным
+    assert stub_server.hosts == [f'localhost:{stub_server.server_port}']
+
+
+def test_local_stub_refused_when_private_hosts_disallowed(stub_server, monkeypatch):
+    monkeypatch.setattr(settings, 'ENRICH_ALLOW_PRIVATE_HOSTS', False)
+
+    assert fetch(f'http://localhost:{stub_server.server_port}/page') is None
+    assert fetch(f'http://127.0.0.1:{stub_server.server_port}/page') is None
+    assert stub_server.hosts == []
+
+
+def test_connection_uses_checked_address(stub_server, monkeypatch):
+    # Имя не разрешается системным DNS: страница доступна, только если клиент подключается
+    # к адресу, полученному при проверке, а не разрешает имя повторно
+    async def resolve_host(host):
+        return [ipaddress.ip_address('127.0.0.1')] if host == 'stub.invalid' else []
+
+    monkeypatch.setattr(previews, 'resolve_host', resolve_host)
+    monkeypatch.setattr(settings, 'ENRICH_ALLOW_PRIVATE_HOSTS', True)
+
+    preview = fetch(f'http://stub.invalid:{stub_server.server_port}/page')
+
+    assert preview is not None and preview['title'] == 'Stub page'
+    assert stub_server.hosts == [f'stub.invalid:{stub_server.server_port}']